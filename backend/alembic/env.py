@@ -8,7 +8,7 @@ from alembic import context
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import User, Wishlist, WishlistItem, Reservation, Contribution
+from app.models import User, Wishlist, WishlistItem, Reservation, Contribution, PriceObservation, RateLimitBucket, IdempotencyKey
 
 config = context.config
 
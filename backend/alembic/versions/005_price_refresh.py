@@ -0,0 +1,44 @@
+"""Price refresh: conditional-fetch validators and price history
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("wishlist_items", sa.Column("fetch_etag", sa.String(255), nullable=True))
+    op.add_column("wishlist_items", sa.Column("fetch_last_modified", sa.String(64), nullable=True))
+    op.add_column("wishlist_items", sa.Column("price_checked_at", sa.DateTime(), nullable=True))
+    op.create_index(op.f("ix_wishlist_items_price_checked_at"), "wishlist_items", ["price_checked_at"])
+
+    op.create_table(
+        "item_price_history",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("item_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("price", sa.Numeric(12, 2), nullable=False),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["wishlist_items.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_item_price_history_item_id"), "item_price_history", ["item_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_item_price_history_item_id"), table_name="item_price_history")
+    op.drop_table("item_price_history")
+    op.drop_index(op.f("ix_wishlist_items_price_checked_at"), table_name="wishlist_items")
+    op.drop_column("wishlist_items", "price_checked_at")
+    op.drop_column("wishlist_items", "fetch_last_modified")
+    op.drop_column("wishlist_items", "fetch_etag")
@@ -0,0 +1,24 @@
+"""Content hash of each item's cached image
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("wishlist_items", sa.Column("image_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("wishlist_items", "image_hash")
@@ -0,0 +1,25 @@
+"""Index the foreign keys that ON DELETE CASCADE follows
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_wishlist_items_wishlist_id"), "wishlist_items", ["wishlist_id"])
+    op.create_index(op.f("ix_contributions_item_id"), "contributions", ["item_id"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_contributions_item_id"), table_name="contributions")
+    op.drop_index(op.f("ix_wishlist_items_wishlist_id"), table_name="wishlist_items")
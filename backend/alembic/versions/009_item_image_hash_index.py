@@ -0,0 +1,23 @@
+"""Index wishlist_items.image_hash for rebuilding lost image cache entries
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_wishlist_items_image_hash"), "wishlist_items", ["image_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_wishlist_items_image_hash"), table_name="wishlist_items")
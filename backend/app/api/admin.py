@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+
+from app.core.auth import get_admin_user
+from app.core.config import settings
+from app.core.database import slow_query_log
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/slow-queries")
+async def slow_queries(limit: int = 50):
+    return {
+        "enabled": settings.slow_query_log_enabled,
+        "threshold_ms": settings.slow_query_threshold_ms,
+        "entries": list(reversed(slow_query_log.entries))[:max(limit, 0)],
+    }
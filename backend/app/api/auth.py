@@ -1,6 +1,7 @@
+import asyncio
 import os
+import sys
 import logging
-from authlib.integrations.httpx_client import AsyncOAuth2Client
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy import select
@@ -16,6 +17,16 @@ from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def __getattr__(name: str):
+    # authlib (and httpx under it) is only needed for the OAuth callback, so it
+    # is imported on first access instead of at startup.
+    if name == "AsyncOAuth2Client":
+        from authlib.integrations.httpx_client import AsyncOAuth2Client
+        globals()[name] = AsyncOAuth2Client
+        return AsyncOAuth2Client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 @router.post("/register", response_model=TokenResponse)
 async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
@@ -23,7 +34,8 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     user = User(
         email=data.email,
-        password_hash=hash_password(data.password),
+        # bcrypt is deliberately slow; keep it off the event loop.
+        password_hash=await asyncio.to_thread(hash_password, data.password),
         name=data.name,
     )
     db.add(user)
@@ -37,7 +49,7 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
 async def login(data: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == data.email))
     user = result.scalar_one_or_none()
-    if not user or not user.password_hash or not verify_password(data.password, user.password_hash):
+    if not user or not user.password_hash or not await asyncio.to_thread(verify_password, data.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token({"sub": str(user.id)})
     return TokenResponse(access_token=token, user=UserResponse.model_validate(user))
@@ -83,7 +95,7 @@ async def oauth_google_callback(data: OAuthGoogleCallback, db: AsyncSession = De
     if not code:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Отсутствует код авторизации")
     try:
-        client = AsyncOAuth2Client(
+        client = sys.modules[__name__].AsyncOAuth2Client(
             client_id=client_id,
             client_secret=settings.google_client_secret,
             redirect_uri=redirect_uri,
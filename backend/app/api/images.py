@@ -0,0 +1,37 @@
+import asyncio
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_db
+from app.services import images
+
+router = APIRouter(prefix="/img", tags=["images"])
+
+# Paths are content hashes, so a given URL never changes.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}")
+async def get_image(
+    digest: str, request: Request, background_tasks: BackgroundTasks, w: int | None = None, db: AsyncSession = Depends(get_read_db)
+):
+    if not images.HASH_RE.match(digest):
+        raise HTTPException(status_code=404)
+    accept = request.headers.get("accept", "")
+    found = await asyncio.to_thread(images.variant, digest, w, accept)
+    if not found:
+        # The cache did not survive (e.g. a redeploy on an ephemeral disk): send the
+        # browser to the original for now and rebuild the entry in the background.
+        source = await images.source_of(db, digest)
+        if not source or not source[1].startswith(("http://", "https://")):
+            raise HTTPException(status_code=404)
+        item_id, url = source
+        background_tasks.add_task(images.recover, digest, item_id, url)
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+    path, media_type, etag = found
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag, "Vary": "Accept"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
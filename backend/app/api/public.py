@@ -1,17 +1,20 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.exc import IntegrityError
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, stick_to_primary, viewer_key
+from app.core import idempotency
 from app.core.auth import get_current_user_optional
+from app.core.ratelimit import rate_limit
+from app.core.responses import FastJSONResponse
 from app.models.user import User
 from app.models.wishlist import WishlistItem
 from app.schemas.wishlist import WishlistItemPublic, ReserveRequest, ContributeRequest, UnreserveRequest
 from app.services import wishlist as wishlist_service
-from app.services.wishlist import ContributionExceedsTarget
-from app.websocket.manager import manager
+from app.services.wishlist import ContributionExceedsTarget, ItemAlreadyReserved
+from app.websocket import sse
 
 router = APIRouter(prefix="/wishlists/public", tags=["public"])
 
@@ -35,6 +38,7 @@ def _public_item(item: WishlistItem, reserver_key: str, contributor_key: str) ->
         url=item.url,
         price=item.price,
         image_url=item.image_url,
+        image_hash=item.image_hash,
         target_amount=item.target_amount,
         reserved=reserved,
         reserved_by_me=reserved_by_me,
@@ -44,44 +48,75 @@ def _public_item(item: WishlistItem, reserver_key: str, contributor_key: str) ->
     )
 
 
-@router.post("/{slug}/items/{item_id}/reserve")
-async def reserve_item(slug: str, item_id: UUID, body: ReserveRequest, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_current_user_optional)):
+@router.post("/{slug}/items/{item_id}/reserve", dependencies=[Depends(rate_limit("reserve"))])
+async def reserve_item(slug: str, item_id: UUID, body: ReserveRequest, request: Request, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_current_user_optional)):
     key = _get_key(user, body.anonymous_token)
     if not key:
         raise HTTPException(status_code=400, detail="anonymous_token or auth required")
-    try:
-        item = await wishlist_service.reserve_item(db, slug, item_id, key, user is None)
-    except IntegrityError:
-        await db.rollback()
-        raise HTTPException(status_code=404, detail="Item not found or already reserved")
-    if not item:
+    replay = await idempotency.claim(db, request, key)
+    if replay:
+        return replay
+    if not await wishlist_service.reserve_item(db, slug, item_id, key, user is None):
         raise HTTPException(status_code=404, detail="Item not found or already reserved")
-    await manager.broadcast(f"wishlist:{slug}", {"type": "reservation", "itemId": str(item_id)})
-    return {"ok": True}
+    response = FastJSONResponse({"ok": True})
+    stick_to_primary(response, viewer_key(request, body.anonymous_token))
+    await idempotency.remember(db, request, response)
+    return response
 
 
-@router.delete("/{slug}/items/{item_id}/reserve")
-async def unreserve_item(slug: str, item_id: UUID, body: UnreserveRequest, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_current_user_optional)):
+@router.delete("/{slug}/items/{item_id}/reserve", dependencies=[Depends(rate_limit("reserve"))])
+async def unreserve_item(slug: str, item_id: UUID, body: UnreserveRequest, request: Request, response: Response, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_current_user_optional)):
     key = _get_key(user, body.anonymous_token)
     if not key:
         raise HTTPException(status_code=400, detail="anonymous_token or auth required")
     ok = await wishlist_service.unreserve_item(db, slug, item_id, key)
     if not ok:
         raise HTTPException(status_code=404)
-    await manager.broadcast(f"wishlist:{slug}", {"type": "unreserve", "itemId": str(item_id)})
+    stick_to_primary(response, viewer_key(request, body.anonymous_token))
     return {"ok": True}
 
 
-@router.post("/{slug}/items/{item_id}/contribute")
-async def contribute_item(slug: str, item_id: UUID, body: ContributeRequest, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_current_user_optional)):
-    key = _get_key(user, body.anonymous_token)
+@router.post("/{slug}/items/{item_id}/contribute", response_model=WishlistItemPublic, dependencies=[Depends(rate_limit("contribute"))])
+async def contribute_item(slug: str, item_id: UUID, body: ContributeRequest, request: Request, anonymous_token: str | None = None, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_current_user_optional)):
+    # Older clients sent the token as a query parameter.
+    token = body.anonymous_token or anonymous_token
+    key = _get_key(user, token)
     if not key:
         raise HTTPException(status_code=400, detail="anonymous_token or auth required")
+    replay = await idempotency.claim(db, request, key)
+    if replay:
+        return replay
     try:
         item = await wishlist_service.contribute_item(db, slug, item_id, key, body.amount, user is None)
     except ContributionExceedsTarget:
         raise HTTPException(status_code=400, detail="Amount exceeds remaining target")
+    except ItemAlreadyReserved:
+        raise HTTPException(status_code=400, detail="Item is already reserved")
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    await manager.broadcast(f"wishlist:{slug}", {"type": "contribution", "itemId": str(item_id)})
-    return {"ok": True}
+    response = FastJSONResponse(_public_item(item, key, key))
+    stick_to_primary(response, viewer_key(request, token))
+    await idempotency.remember(db, request, response)
+    return response
+
+
+@router.get("/{slug}/events")
+async def wishlist_events(
+    slug: str,
+    since: int | None = None,
+    last_event_id: str | None = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Server-Sent Events mirror of the wishlist WebSocket, for clients behind proxies that block upgrades."""
+    wishlist = await wishlist_service.get_wishlist_by_slug(db, slug)
+    # The stream can live for hours: return the connection to the pool before it starts.
+    await db.close()
+    if not wishlist:
+        raise HTTPException(status_code=404, detail="Wishlist not found")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        sse.stream(f"wishlist:{slug}", since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
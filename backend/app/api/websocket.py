@@ -1,7 +1,10 @@
+import json
+
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_read_db
 from app.services import wishlist as wishlist_service
 from app.websocket.manager import manager
 
@@ -9,15 +12,71 @@ router = APIRouter(tags=["websocket"])
 
 
 @router.websocket("/ws/wishlist/{slug}")
-async def wishlist_websocket(websocket: WebSocket, slug: str, db: AsyncSession = Depends(get_db)):
+async def wishlist_websocket(websocket: WebSocket, slug: str, since: int | None = None, db: AsyncSession = Depends(get_read_db)):
     wishlist = await wishlist_service.get_wishlist_by_slug(db, slug)
     if not wishlist:
         await websocket.close(code=4004)
         return
     channel = f"wishlist:{slug}"
-    await manager.connect(websocket, channel)
+    if not await manager.connect(websocket, channel):
+        return
+    try:
+        await manager.catch_up(websocket, channel, since)
+        while True:
+            # Any frame, pong or otherwise, proves the client is still there.
+            await websocket.receive_text()
+            manager.touch(websocket)
+    except WebSocketDisconnect:
+        manager.disconnect(websocket)
+
+
+async def _handle(websocket: WebSocket, db: AsyncSession, message: dict) -> dict | None:
+    kind, slug, since = message.get("type"), message.get("slug"), message.get("since")
+    if kind == "pong":
+        return None
+    if kind not in ("subscribe", "unsubscribe") or not isinstance(slug, str):
+        return {"type": "error", "detail": "bad_request"}
+    if since is not None and not isinstance(since, int):
+        return {"type": "error", "detail": "bad_request"}
+    channel = f"wishlist:{slug}"
+    if kind == "unsubscribe":
+        manager.unsubscribe(websocket, channel)
+        return {"type": "unsubscribed", "channel": channel}
+    subscribed = manager.subscriptions(websocket)
+    if channel not in subscribed:
+        if len(subscribed) >= settings.ws_max_subscriptions:
+            return {"type": "error", "channel": channel, "detail": "too_many_subscriptions"}
+        wishlist = await wishlist_service.get_wishlist_by_slug(db, slug)
+        # Hand the connection back to the pool between subscriptions.
+        await db.rollback()
+        if not wishlist:
+            return {"type": "error", "channel": channel, "detail": "not_found"}
+        if not manager.subscribe(websocket, channel):
+            return {"type": "error", "channel": channel, "detail": "over_capacity"}
+    await websocket.send_text(json.dumps({"type": "subscribed", "channel": channel, "seq": manager.last_seq(channel)}))
+    await manager.catch_up(websocket, channel, since)
+    return None
+
+
+@router.websocket("/ws")
+async def multiplex_websocket(websocket: WebSocket, db: AsyncSession = Depends(get_read_db)):
+    """One socket, many wishlists.
+
+    Clients send ``{"type": "subscribe" | "unsubscribe", "slug": ..., "since": seq}``;
+    every event carries the ``channel`` it was published on and its ``seq``.
+    """
+    if not await manager.accept(websocket):
+        return
     try:
         while True:
-            data = await websocket.receive_text()
+            raw = await websocket.receive_text()
+            manager.touch(websocket)
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                message = None
+            reply = await _handle(websocket, db, message) if isinstance(message, dict) else {"type": "error", "detail": "bad_request"}
+            if reply is not None:
+                await websocket.send_text(json.dumps(reply))
     except WebSocketDisconnect:
-        manager.disconnect(websocket, channel)
+        manager.disconnect(websocket)
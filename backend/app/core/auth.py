@@ -5,6 +5,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2Pas
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import tracing
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
@@ -18,17 +20,26 @@ async def get_current_user_optional(
 ) -> User | None:
     if not credentials:
         return None
-    payload = decode_token(credentials.credentials)
-    if not payload:
-        return None
-    user_id = payload.get("sub")
-    if not user_id:
-        return None
-    result = await db.execute(select(User).where(User.id == UUID(user_id)))
-    return result.scalar_one_or_none()
+    with tracing.span("auth"):
+        payload = decode_token(credentials.credentials)
+        if not payload:
+            return None
+        user_id = payload.get("sub")
+        if not user_id:
+            return None
+        result = await db.execute(select(User).where(User.id == UUID(user_id)))
+        return result.scalar_one_or_none()
 
 
 async def get_current_user(user: User | None = Depends(get_current_user_optional)) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     return user
+
+
+async def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    # By id, not email: registration does not prove the address belongs to the caller.
+    admins = {i.strip().lower() for i in settings.admin_user_ids.split(",") if i.strip()}
+    if str(user.id) not in admins:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return user
@@ -1,9 +1,28 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
 import ssl as _ssl
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from uuid import uuid4
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
+from fastapi import Response
+from fastapi.requests import HTTPConnection
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
+from app.core import metrics, tracing
 from app.core.config import settings
 
 
@@ -12,6 +31,7 @@ def _fix_asyncpg_url(url: str) -> tuple[str, dict]:
     params = parse_qs(parsed.query)
     needs_ssl = params.pop("sslmode", [None])[0] in ("require", "verify-ca", "verify-full")
     params.pop("channel_binding", None)
+    params.pop("pgbouncer", None)
     clean_query = urlencode({k: v[0] for k, v in params.items()}, doseq=False)
     clean_url = urlunparse(parsed._replace(query=clean_query))
     connect_args: dict = {}
@@ -23,13 +43,257 @@ def _fix_asyncpg_url(url: str) -> tuple[str, dict]:
     return clean_url, connect_args
 
 
-_db_url, _connect_args = _fix_asyncpg_url(settings.database_url)
+PROFILE_DIRECT = "direct"
+PROFILE_TRANSACTION_POOLER = "transaction-pooler"
+PROFILE_SQLITE = "sqlite"
+PROFILES = (PROFILE_DIRECT, PROFILE_TRANSACTION_POOLER, PROFILE_SQLITE)
 
-engine = create_async_engine(
-    _db_url,
-    echo=False,
-    connect_args=_connect_args,
-)
+# PgBouncer listens on 6432 by default; Supabase's transaction pooler on 6543.
+_POOLER_PORTS = (6432, 6543)
+
+
+def detect_profile(url: str) -> str:
+    parsed = urlparse(url)
+    if parsed.scheme.startswith("sqlite"):
+        return PROFILE_SQLITE
+    params = parse_qs(parsed.query)
+    if params.get("pgbouncer", [""])[0].lower() == "true":
+        return PROFILE_TRANSACTION_POOLER
+    # Neon exposes its PgBouncer endpoint as <endpoint>-pooler.<region>...
+    if "pooler" in (parsed.hostname or ""):
+        return PROFILE_TRANSACTION_POOLER
+    if parsed.port in _POOLER_PORTS:
+        return PROFILE_TRANSACTION_POOLER
+    return PROFILE_DIRECT
+
+
+def engine_options(url: str, profile: str = "auto") -> tuple[str, dict]:
+    if profile == "auto":
+        profile = detect_profile(url)
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+    if profile == PROFILE_SQLITE:
+        return url, {}
+    clean_url, connect_args = _fix_asyncpg_url(url)
+    pool_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    options: dict = {"pool_pre_ping": settings.db_pool_pre_ping, "connect_args": connect_args}
+    if profile == PROFILE_TRANSACTION_POOLER:
+        # Server-side prepared statements do not survive transaction pooling:
+        # disable both asyncpg's and SQLAlchemy's caches and keep names unique.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        if settings.db_pooler_null_pool:
+            options["poolclass"] = NullPool
+            return clean_url, options
+    options.update(pool_options)
+    return clean_url, options
+
+
+def _statement_kind(statement: str) -> str:
+    words = statement.split(None, 1)
+    return words[0].upper() if words else "OTHER"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+
+_query_counters: ContextVar[tuple[QueryCounter, ...]] = ContextVar("query_counters", default=())
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed in the current context; nested counters all see them."""
+    counter = QueryCounter()
+    token = _query_counters.set(_query_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _query_counters.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _query_counters.get():
+        counter.count += 1
+    if context is not None:
+        context._query_started = time.perf_counter()
+        kind = _statement_kind(statement)
+        context._span = tracing.start_span(f"db {kind}", **tracing.db_statement_attributes(statement, kind))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    kind = _statement_kind(statement)
+    metrics.db_queries.inc(statement=kind)
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        metrics.db_query_duration.observe(time.perf_counter() - started, statement=kind)
+    tracing.end_span(getattr(context, "_span", None))
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    tracing.end_span(getattr(context, "_span", None), exception_context.original_exception)
+
+
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def enforce_foreign_keys(engine) -> None:
+    """SQLite ignores FOREIGN KEY clauses unless asked, so ON DELETE CASCADE would never fire."""
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_foreign_keys)
+
+
+slow_log = logging.getLogger("app.slow_query")
+
+
+def _redact(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters, executemany: bool = False):
+    """Parameter shapes without their values, safe to log."""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: _redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact(value) for value in parameters]
+    return _redact(parameters)
+
+
+class SlowQueryLog:
+    """Ring of statements slower than ``slow_query_threshold_ms``, each with its query plan.
+
+    The plan comes from EXPLAIN (EXPLAIN QUERY PLAN on SQLite) run on a separate
+    connection after the fact, never on the connection that ran the statement.
+    Plans are remembered per statement, so one that is always slow is explained once.
+    """
+
+    def __init__(self, size: int, plans: int = 500):
+        self.entries: deque[dict] = deque(maxlen=size)
+        self._explaining: set[str] = set()
+        self._plans: OrderedDict[str, list[str]] = OrderedDict()
+        self._max_plans = plans
+        self._tasks: set[asyncio.Task] = set()
+        self._file_handler = None
+
+    def watch(self, engine, label: str) -> None:
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "_query_started", None)
+            if not settings.slow_query_log_enabled or started is None:
+                return
+            duration = time.perf_counter() - started
+            if duration * 1000 >= settings.slow_query_threshold_ms:
+                self.record(engine, label, statement, parameters, executemany, duration)
+
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def _configure_file(self) -> None:
+        if settings.slow_query_log_file and self._file_handler is None:
+            self._file_handler = RotatingFileHandler(settings.slow_query_log_file, maxBytes=5_000_000, backupCount=3)
+            self._file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            slow_log.addHandler(self._file_handler)
+
+    def record(self, engine, label: str, statement: str, parameters, executemany: bool, duration: float) -> dict | None:
+        if statement.lstrip().upper().startswith("EXPLAIN"):
+            return None
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "engine": label,
+            "duration_ms": round(duration * 1000, 1),
+            "statement": statement,
+            "parameters": redact_parameters(parameters, executemany),
+            "plan": None,
+        }
+        self.entries.append(entry)
+        self._configure_file()
+        slow_log.warning("Slow query on %s (%.1f ms): %s params=%s", label, entry["duration_ms"], statement, entry["parameters"])
+        if not settings.slow_query_explain or executemany or statement in self._explaining:
+            return entry
+        if statement in self._plans:
+            self._plans.move_to_end(statement)
+            entry["plan"] = self._plans[statement]
+            return entry
+        if _statement_kind(statement) not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+            return entry
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return entry
+        self._explaining.add(statement)
+        # A fresh context keeps the EXPLAIN out of the caller's query counters and trace.
+        task = loop.create_task(self._explain(engine, entry, parameters), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return entry
+
+    async def _explain(self, engine, entry: dict, parameters) -> None:
+        statement = entry["statement"]
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            async with engine.connect() as conn:
+                rows = (await conn.exec_driver_sql(prefix + statement, parameters)).all()
+            # The plan text is the last column on both SQLite and Postgres.
+            entry["plan"] = [str(row[-1]) for row in rows]
+            self._plans[statement] = entry["plan"]
+            while len(self._plans) > self._max_plans:
+                self._plans.popitem(last=False)
+            slow_log.warning("Plan for slow query %s:\n%s", statement, "\n".join(entry["plan"]))
+        except Exception as exc:
+            entry["plan_error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            self._explaining.discard(statement)
+
+    async def flush(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_log_size)
+
+
+def instrument_engine(engine, label: str) -> None:
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "checkout", lambda *args: metrics.db_pool_in_use.inc(engine=label))
+    event.listen(sync_engine, "checkin", lambda *args: metrics.db_pool_in_use.dec(engine=label))
+
+    # The pool has no "before checkout" event, so time the acquisition itself.
+    raw_connection = sync_engine.raw_connection
+
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            metrics.db_pool_checkout_wait.observe(time.perf_counter() - started, engine=label)
+
+    sync_engine.raw_connection = timed_raw_connection
+    slow_query_log.watch(engine, label)
+
+
+_db_url, _engine_options = engine_options(settings.database_url, settings.db_profile)
+
+engine = create_async_engine(_db_url, echo=False, **_engine_options)
+enforce_foreign_keys(engine)
+instrument_engine(engine, "primary")
 
 async_session = async_sessionmaker(
     engine,
@@ -39,11 +303,36 @@ async_session = async_sessionmaker(
     autoflush=False,
 )
 
+read_engine = None
+read_session = async_session
+if settings.database_read_url:
+    _read_url, _read_engine_options = engine_options(settings.database_read_url, settings.db_profile)
+    read_engine = create_async_engine(_read_url, echo=False, **_read_engine_options)
+    enforce_foreign_keys(read_engine)
+    instrument_engine(read_engine, "replica")
+    read_session = async_sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 
 class Base(DeclarativeBase):
     pass
 
 
+def dialect_insert(db: AsyncSession, entity):
+    """INSERT construct with ON CONFLICT / RETURNING support for the session's backend."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return pg_insert(entity)
+    if dialect == "sqlite":
+        return sqlite_insert(entity)
+    raise ValueError(f"Unsupported dialect: {dialect}")
+
+
 async def get_db():
     async with async_session() as session:
         try:
@@ -54,3 +343,66 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+PRIMARY_STICKY_COOKIE = "wl_primary"
+
+_recent_writers: dict[str, float] = {}
+
+
+def viewer_key(request: HTTPConnection, anonymous_token: str | None = None) -> str:
+    """Stable key for the caller, hashed so live bearer tokens are not kept in memory."""
+    raw = anonymous_token or request.query_params.get("anonymous_token") or request.headers.get("authorization")
+    return hashlib.sha256(raw.encode()).hexdigest() if raw else ""
+
+
+def stick_to_primary(response: Response, key: str) -> None:
+    """Route this viewer's reads to the primary for a short window after a mutation."""
+    window = settings.read_primary_sticky_seconds
+    if read_engine is None or window <= 0:
+        return
+    now = time.monotonic()
+    if key:
+        _recent_writers[key] = now + window
+    for k in [k for k, deadline in _recent_writers.items() if deadline <= now]:
+        del _recent_writers[k]
+    response.set_cookie(PRIMARY_STICKY_COOKIE, "1", max_age=max(int(window), 1), httponly=True, samesite="none", secure=True)
+
+
+def prefers_primary(request: HTTPConnection) -> bool:
+    if request.cookies.get(PRIMARY_STICKY_COOKIE):
+        return True
+    deadline = _recent_writers.get(viewer_key(request))
+    return deadline is not None and deadline > time.monotonic()
+
+
+async def get_read_db(request: HTTPConnection):
+    factory = async_session if prefers_primary(request) else read_session
+    async with factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+QUERY_COUNT_HEADER = "x-query-count"
+
+
+class QueryCountMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with count_queries() as counter:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start" and settings.debug:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.encode(), str(counter.count).encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session, dialect_insert
+from app.models.idempotency import IdempotencyKey
+
+log = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def _sha256(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def claim(db: AsyncSession, request: Request, identity: str) -> Response | None:
+    """Reserve the request's Idempotency-Key inside the current transaction.
+
+    Returns the stored response when the key was already used, or None when
+    the handler should run and then call ``remember``. The claim shares the
+    handler's transaction: if the handler fails, the key is released with it.
+    A key past its TTL counts as unused even before the sweeper removes it.
+    """
+    header = request.headers.get(HEADER)
+    if not header:
+        return None
+    if len(header) > 255:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Idempotency-Key too long")
+    key = _sha256(identity.encode(), f"{request.method} {request.url.path}".encode(), header.encode())
+    fingerprint = _sha256(await request.body())
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=settings.idempotency_ttl)
+    stmt = (
+        dialect_insert(db, IdempotencyKey)
+        .values(key=key, fingerprint=fingerprint, expires_at=expires_at)
+        .on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={"fingerprint": fingerprint, "expires_at": expires_at, "status_code": None, "body": None},
+            where=IdempotencyKey.expires_at < now,
+        )
+        .returning(IdempotencyKey.key)
+    )
+    if (await db.execute(stmt)).first():
+        request.state.idempotency_key = key
+        return None
+    stored = (await db.execute(
+        select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body).where(IdempotencyKey.key == key)
+    )).one()
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Idempotency-Key reused with a different request")
+    if stored.status_code is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A request with this Idempotency-Key is in progress")
+    return Response(stored.body, status_code=stored.status_code, media_type="application/json", headers={REPLAYED_HEADER: "true"})
+
+
+async def remember(db: AsyncSession, request: Request, response: Response) -> None:
+    key = getattr(request.state, "idempotency_key", None)
+    if key is None:
+        return
+    await db.execute(
+        update(IdempotencyKey).where(IdempotencyKey.key == key).values(status_code=response.status_code, body=response.body)
+    )
+
+
+async def sweep(session_factory=async_session) -> int:
+    async with session_factory() as db:
+        result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow()))
+        await db.commit()
+    return result.rowcount
+
+
+async def run_sweeper() -> None:
+    while True:
+        await asyncio.sleep(settings.idempotency_sweep_interval)
+        try:
+            removed = await sweep()
+            if removed:
+                log.info("Swept %d expired idempotency key(s)", removed)
+        except Exception:
+            log.exception("Idempotency key sweep failed")
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.models.user import User
+from app.services import wishlist as wishlist_service
+from app.websocket import outbox
+
+log = logging.getLogger(__name__)
+
+_NIL_UUID = UUID(int=0)
+
+
+class AppState:
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+
+    async def wait_idle(self, timeout: float, poll: float = 0.05) -> bool:
+        deadline = time.monotonic() + timeout
+        while self.in_flight > 0:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll)
+        return True
+
+
+state = AppState()
+
+
+class InFlightMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            state.in_flight -= 1
+
+
+async def _prime(conn) -> None:
+    await conn.execute(text("SELECT 1"))
+    async with AsyncSession(bind=conn) as session:
+        await session.execute(select(User).where(User.id == _NIL_UUID))
+        await wishlist_service.get_wishlist_by_slug(session, "")
+        await wishlist_service.get_my_wishlists(session, _NIL_UUID)
+        await wishlist_service.get_wishlist_by_id(session, _NIL_UUID, _NIL_UUID)
+
+
+async def warm_up(engine: AsyncEngine, connections: int) -> int:
+    """Open up to ``connections`` pooled connections at once and run the hot queries on each.
+
+    Returns the number of connections warmed.
+    """
+    pool = engine.sync_engine.pool
+    if connections <= 0 or isinstance(pool, NullPool):
+        return 0
+    size = getattr(pool, "size", lambda: connections)()
+    opened = await asyncio.gather(*(engine.connect() for _ in range(min(connections, size))), return_exceptions=True)
+    conns = [c for c in opened if not isinstance(c, BaseException)]
+    try:
+        for conn in conns:
+            await _prime(conn)
+            await conn.rollback()
+    finally:
+        for conn in conns:
+            await conn.close()
+    errors = [c for c in opened if isinstance(c, BaseException)]
+    if errors:
+        raise errors[0]
+    return len(conns)
+
+
+async def startup(engines: list[AsyncEngine]) -> None:
+    state.ready = False
+    state.draining = False
+    for engine in engines:
+        try:
+            warmed = await asyncio.wait_for(warm_up(engine, settings.db_warmup_connections), settings.db_warmup_timeout)
+            log.info("Warmed %d connection(s) for %s", warmed, engine.url.render_as_string(hide_password=True))
+        except Exception:
+            # Warm-up is best effort: the first requests pay the cost instead.
+            log.warning("Database warm-up failed", exc_info=True)
+    state.ready = True
+
+
+async def shutdown(engines: list[AsyncEngine]) -> None:
+    state.ready = False
+    state.draining = True
+    if not await state.wait_idle(settings.shutdown_drain_timeout):
+        log.warning("Shutting down with %d request(s) still in flight", state.in_flight)
+    await outbox.flush()
+    for engine in engines:
+        await engine.dispose()
@@ -0,0 +1,95 @@
+import asyncio
+import gc
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+
+from app.core import metrics
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task.
+
+    ``run()`` records every sample as ``event_loop_lag_seconds``. A watchdog
+    thread notices when the loop has not woken the monitor for longer than
+    ``threshold`` and logs the loop thread's stack at that moment, which is the
+    code that is blocking it.
+    """
+
+    def __init__(self, interval: float | None = None, threshold: float | None = None, history: int = 20):
+        self.interval = settings.loop_lag_interval if interval is None else interval
+        self.threshold = settings.loop_lag_threshold_ms / 1000 if threshold is None else threshold
+        self.max_lag = 0.0
+        self.blocked: deque[dict] = deque(maxlen=history)
+        self._beat = time.monotonic()
+        self._reported_beat = 0.0
+        self._loop_thread: int | None = None
+        self._stopped = threading.Event()
+
+    def _watch(self) -> None:
+        poll = max(0.001, min(self.interval, self.threshold) / 2)
+        while not self._stopped.wait(poll):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == self._reported_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self._reported_beat = beat
+            stack = "".join(traceback.format_stack(frame))
+            self.blocked.append({"blocked_ms": round(stalled * 1000, 1), "stack": stack})
+            metrics.event_loop_blocked.inc()
+            log.warning("Event loop blocked for at least %.0f ms in:\n%s", stalled * 1000, stack)
+
+    async def run(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                self._beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.monotonic() - self._beat - self.interval)
+                self.max_lag = max(self.max_lag, lag)
+                metrics.event_loop_lag.observe(lag)
+        finally:
+            self._stopped.set()
+
+
+@asynccontextmanager
+async def max_loop_block(limit_ms: float, interval: float = 0.005):
+    """Fail when anything inside the block stalls the event loop for more than ``limit_ms``.
+
+    Garbage collection is collected up front and paused inside the block: a
+    full collection can stall the loop past the limit in whatever code happens
+    to allocate, which is not a blocking call.
+    """
+    gc_was_enabled = gc.isenabled()
+    if gc_was_enabled:
+        # Nested blocks skip this: the outer one already collected, and is watching.
+        gc.collect()
+        gc.disable()
+    monitor = LoopLagMonitor(interval=interval, threshold=limit_ms / 1000)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0)
+    try:
+        yield monitor
+        # Let the monitor wake once more so a stall at the very end is measured.
+        await asyncio.sleep(interval * 2)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        if gc_was_enabled:
+            gc.enable()
+    if monitor.max_lag * 1000 > limit_ms:
+        stacks = "\n".join(b["stack"] for b in monitor.blocked)
+        raise AssertionError(f"Event loop blocked for {monitor.max_lag * 1000:.0f} ms (limit {limit_ms:.0f} ms)\n{stacks}")
@@ -0,0 +1,223 @@
+from threading import Lock
+from time import perf_counter
+
+_INF_LE = 'le="+Inf"'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def remove(self, **labels: str) -> None:
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def collect(self) -> list[str]:
+        lines = self._header()
+        for key, (bucket_counts, total, count) in sorted(self._series.items()):
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, _INF_LE)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+registry = Registry()
+
+slug_collisions = registry.register(
+    Counter("wishlist_slug_collisions_total", "Wishlist slug allocations that hit an existing slug")
+)
+
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+)
+http_responses = registry.register(
+    Counter("http_responses_total", "HTTP responses by route and status", ("method", "route", "status"))
+)
+
+rate_limited = registry.register(
+    Counter("rate_limited_total", "Requests rejected with 429 by route limit", ("route",))
+)
+
+db_pool_checkout_wait = registry.register(
+    Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ("engine",))
+)
+db_pool_in_use = registry.register(
+    Gauge("db_pool_connections_in_use", "Connections currently checked out of the pool", ("engine",))
+)
+db_queries = registry.register(
+    Counter("db_queries_total", "SQL statements executed", ("statement",))
+)
+db_query_duration = registry.register(
+    Histogram("db_query_duration_seconds", "SQL statement execution time", ("statement",))
+)
+
+# No per-channel labels: channel names carry the secret wishlist slugs.
+websocket_connections = registry.register(
+    Gauge("websocket_connections", "Live WebSocket and SSE connections")
+)
+websocket_channels = registry.register(
+    Gauge("websocket_channels", "Wishlists with at least one live subscriber")
+)
+websocket_reaped = registry.register(
+    Counter("websocket_reaped_total", "WebSocket connections evicted for not answering pings")
+)
+websocket_rejected = registry.register(
+    Counter("websocket_rejected_total", "WebSocket connections refused by the connection caps")
+)
+websocket_broadcast_duration = registry.register(
+    Histogram("websocket_broadcast_duration_seconds", "Time to fan a broadcast out to every socket in a channel")
+)
+
+outbound_fetch_duration = registry.register(
+    Histogram("outbound_fetch_duration_seconds", "Latency of outbound meta fetches by host", ("host",))
+)
+
+price_refreshes = registry.register(
+    Counter("price_refresh_total", "Item page re-checks by outcome", ("outcome",))
+)
+
+event_loop_lag = registry.register(
+    Histogram(
+        "event_loop_lag_seconds",
+        "How late the event loop woke a sleeping task",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    )
+)
+event_loop_blocked = registry.register(
+    Counter("event_loop_blocked_total", "Stalls longer than loop_lag_threshold_ms, each logged with a stack")
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to keep cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_request_duration.observe(perf_counter() - start, method=method, route=route)
+            http_responses.inc(method=method, route=route, status=str(status_code))
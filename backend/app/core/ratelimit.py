@@ -0,0 +1,125 @@
+import json
+import math
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import select
+
+from app.core import metrics
+from app.core.config import parse_limit, settings
+from app.core.database import async_session, dialect_insert
+from app.core.security import decode_token
+from app.models.ratelimit import RateLimitBucket
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryStore:
+    """Per-process token buckets, least recently used evicted past ``max_keys``."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.max_keys = max_keys
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = _refill(tokens, updated, now, capacity, rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class DatabaseStore:
+    """Buckets in ``rate_limit_buckets`` so every worker shares one budget."""
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.time()
+        async with async_session() as db:
+            row = (await db.execute(
+                select(RateLimitBucket.tokens, RateLimitBucket.updated_at)
+                .where(RateLimitBucket.key == key)
+                .with_for_update()
+            )).one_or_none()
+            tokens = _refill(row.tokens, row.updated_at, now, capacity, rate) if row else capacity
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            stmt = dialect_insert(db, RateLimitBucket).values(key=key, tokens=tokens, updated_at=now)
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": tokens, "updated_at": now},
+            ))
+            await db.commit()
+        return wait
+
+
+_store: MemoryStore | DatabaseStore | None = None
+
+
+def get_store() -> MemoryStore | DatabaseStore:
+    global _store
+    if _store is None:
+        _store = DatabaseStore() if settings.rate_limit_store == "database" else MemoryStore()
+    return _store
+
+
+async def _identity(request: Request) -> str | None:
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        payload = decode_token(auth[7:])
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    token = request.query_params.get("anonymous_token")
+    if not token and request.headers.get("content-type", "").startswith("application/json"):
+        # Starlette caches the body, so the route still sees it.
+        try:
+            body = json.loads(await request.body() or b"{}")
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and isinstance(body.get("anonymous_token"), str):
+            token = body["anonymous_token"]
+    return f"anon:{token}" if token else None
+
+
+def rate_limit(name: str):
+    """Dependency enforcing the ``rate_limit_<name>`` setting.
+
+    Every caller is limited by client IP, with ``rate_limit_ip_factor`` headroom
+    for shared addresses, and additionally by user id or anonymous_token. Behind
+    a proxy the IP comes from X-Forwarded-For, which uvicorn applies only for
+    peers listed in ``forwarded_allow_ips``.
+    """
+
+    async def dependency(request: Request) -> None:
+        if not settings.rate_limit_enabled:
+            return
+        capacity, rate = parse_limit(getattr(settings, f"rate_limit_{name}"))
+        host = request.client.host if request.client else "unknown"
+        buckets = [(f"{name}:ip:{host}", capacity * settings.rate_limit_ip_factor, rate * settings.rate_limit_ip_factor)]
+        identity = await _identity(request)
+        if identity:
+            buckets.append((f"{name}:{identity}", capacity, rate))
+        store = get_store()
+        wait = 0.0
+        for key, bucket_capacity, bucket_rate in buckets:
+            wait = max(wait, await store.take(key, bucket_capacity, bucket_rate))
+        if wait > 0:
+            metrics.rate_limited.inc(route=name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
@@ -0,0 +1,34 @@
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core import tracing
+
+
+def _default(obj):
+    # Matches Pydantic's JSON mode, which emits Decimals as str(value).
+    if isinstance(obj, Decimal):
+        return str(obj)
+    # Trusted models built with model_construct(): their __dict__ is exactly the fields.
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    """Serialize straight to bytes, skipping response_model re-validation and jsonable_encoder.
+
+    Only for content built from trusted data, e.g. Model.model_construct().
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        with tracing.span("serialize"):
+            return dumps(content)
@@ -1,19 +1,24 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from uuid import UUID
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=1)
+def _pwd_context():
+    # passlib/bcrypt are only needed by password register/login; load them lazily.
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return _pwd_context().verify(plain, hashed)
 
 
 def create_access_token(data: dict) -> str:
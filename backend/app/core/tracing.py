@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-(?P<trace>[0-9a-f]{32})-(?P<span>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})")
+_MAX_STATEMENT = 2000
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "attributes", "start_ns", "end_ns", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, sampled: bool, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = "ok"
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class FileExporter:
+    """Appends finished spans as JSON lines from a background thread, so no collector is needed."""
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self.queue.put(span.to_dict())
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(settings.tracing_file, "a") as f:
+                    f.writelines(json.dumps(span, default=str) + "\n" for span in batch)
+            except OSError:
+                log.warning("Could not write %d span(s) to %s", len(batch), settings.tracing_file, exc_info=True)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every exported span is on disk."""
+        self.queue.join()
+
+
+exporter = FileExporter()
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def current_trace_id() -> str | None:
+    span = _current.get()
+    return span.trace_id if span else None
+
+
+def _parse_traceparent(header: str) -> tuple[str, str, bool] | None:
+    match = _TRACEPARENT_RE.match(header.strip())
+    if not match or match["trace"] == "0" * 32 or match["span"] == "0" * 16:
+        return None
+    return match["trace"], match["span"], bool(int(match["flags"], 16) & 1)
+
+
+def start_span(name: str, traceparent: str | None = None, **attributes) -> Span | None:
+    """A span under the current one, or the root of a new (or continued remote) trace.
+
+    The sampling decision is made once per trace and inherited by its children.
+    """
+    if not settings.tracing_enabled:
+        return None
+    parent = _current.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, parent.sampled, attributes)
+    remote = _parse_traceparent(traceparent) if traceparent else None
+    if remote:
+        trace_id, parent_id, sampled = remote
+    else:
+        trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < settings.tracing_sample_rate
+    return Span(name, trace_id, parent_id, sampled, attributes)
+
+
+def end_span(span: Span | None, error: BaseException | None = None) -> None:
+    if span is None:
+        return
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.status = "error"
+        span.attributes["error.type"] = type(error).__name__
+    if span.sampled:
+        exporter.export(span)
+
+
+@contextmanager
+def span(name: str, traceparent: str | None = None, **attributes):
+    current = start_span(name, traceparent, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        end_span(current, exc)
+        raise
+    else:
+        end_span(current)
+    finally:
+        _current.reset(token)
+
+
+def db_statement_attributes(statement: str, kind: str) -> dict:
+    return {"db.operation": kind, "db.statement": statement[:_MAX_STATEMENT]}
+
+
+class TracingMiddleware:
+    """Root span per HTTP request, named after the matched route; echoes ``traceparent`` back."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.tracing_enabled:
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                incoming = value.decode("latin-1")
+                break
+        method = scope["method"]
+        with span(f"{method} {scope['path']}", incoming, **{"http.method": method}) as root:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    root.set(**{"http.status_code": message["status"]})
+                    message = {**message, "headers": [*message.get("headers", []), (TRACEPARENT.encode(), root.traceparent.encode())]}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    root.name = f"{method} {route}"
+                    root.set(**{"http.route": route})
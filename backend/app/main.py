@@ -1,16 +1,36 @@
+import asyncio
+import secrets
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from app.core.config import settings
-from app.api import auth, wishlists, public, meta, websocket
+from app.core import idempotency, lifecycle, tracing
+from app.core.looplag import LoopLagMonitor
+from app.core.database import QueryCountMiddleware, engine, read_engine, slow_query_log
+from app.core.metrics import MetricsMiddleware, registry
+from app.api import admin, auth, wishlists, public, meta, images, websocket
+from app.services.price_refresh import PriceRefresher
+from app.websocket.manager import manager
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    engines = [e for e in (engine, read_engine) if e is not None]
+    await lifecycle.startup(engines)
+    tasks = [asyncio.create_task(manager.run_reaper()), asyncio.create_task(idempotency.run_sweeper())]
+    if settings.price_refresh_enabled:
+        tasks.append(asyncio.create_task(PriceRefresher().run()))
+    if settings.loop_lag_monitor_enabled:
+        tasks.append(asyncio.create_task(LoopLagMonitor().run()))
     yield
-    pass
+    for task in tasks:
+        task.cancel()
+    await slow_query_log.flush()
+    await lifecycle.shutdown(engines)
+    await asyncio.to_thread(tracing.exporter.flush)
 
 
 app = FastAPI(title="Wishlist API", lifespan=lifespan)
@@ -25,6 +45,10 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryCountMiddleware)
+app.add_middleware(lifecycle.InFlightMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
 
 @app.get("/")
 def root():
@@ -35,8 +59,33 @@ def root():
 def health():
     return {"ok": True}
 
+
+@app.get("/api/ready")
+def ready():
+    if not lifecycle.state.ready:
+        return JSONResponse({"ok": False, "draining": lifecycle.state.draining}, status_code=503)
+    return {"ok": True}
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(request: Request):
+    if settings.metrics_token:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.metrics_token.encode()):
+            raise HTTPException(status_code=401, detail="Metrics token required")
+    elif (
+        not request.client
+        or request.client.host not in ("127.0.0.1", "::1")
+        # Proxied requests are never local, whatever X-Forwarded-For claims.
+        or "x-forwarded-for" in request.headers
+    ):
+        raise HTTPException(status_code=403, detail="Set METRICS_TOKEN to scrape metrics remotely")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(auth.router, prefix="/api")
 app.include_router(wishlists.router, prefix="/api")
 app.include_router(public.router, prefix="/api")
 app.include_router(meta.router, prefix="/api")
+app.include_router(images.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 app.include_router(websocket.router)
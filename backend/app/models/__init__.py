@@ -1,4 +1,6 @@
 from app.models.user import User
-from app.models.wishlist import Wishlist, WishlistItem, Reservation, Contribution
+from app.models.wishlist import Wishlist, WishlistItem, Reservation, Contribution, PriceObservation
+from app.models.ratelimit import RateLimitBucket
+from app.models.idempotency import IdempotencyKey
 
-__all__ = ["User", "Wishlist", "WishlistItem", "Reservation", "Contribution"]
+__all__ = ["User", "Wishlist", "WishlistItem", "Reservation", "Contribution", "PriceObservation", "RateLimitBucket", "IdempotencyKey"]
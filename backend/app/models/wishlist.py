@@ -18,24 +18,30 @@ class Wishlist(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     user: Mapped["User"] = relationship("User", back_populates="wishlists")
-    items: Mapped[list["WishlistItem"]] = relationship("WishlistItem", back_populates="wishlist", cascade="all, delete-orphan")
+    items: Mapped[list["WishlistItem"]] = relationship("WishlistItem", back_populates="wishlist", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class WishlistItem(Base):
     __tablename__ = "wishlist_items"
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
-    wishlist_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("wishlists.id", ondelete="CASCADE"), nullable=False)
+    wishlist_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("wishlists.id", ondelete="CASCADE"), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String(512), nullable=False)
     url: Mapped[str] = mapped_column(String(2048), nullable=False)
     price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False, default=Decimal("0"))
     image_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
+    # Content hash of the cached copy of image_url, served from /api/img/{hash}.
+    image_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
     target_amount: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # Validators from the last product page fetch, for conditional re-fetches.
+    fetch_etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    fetch_last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    price_checked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
 
     wishlist: Mapped["Wishlist"] = relationship("Wishlist", back_populates="items")
-    reservations: Mapped[list["Reservation"]] = relationship("Reservation", back_populates="item", cascade="all, delete-orphan")
-    contributions: Mapped[list["Contribution"]] = relationship("Contribution", back_populates="item", cascade="all, delete-orphan")
+    reservations: Mapped[list["Reservation"]] = relationship("Reservation", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
+    contributions: Mapped[list["Contribution"]] = relationship("Contribution", back_populates="item", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Reservation(Base):
@@ -57,10 +63,19 @@ class Contribution(Base):
     __tablename__ = "contributions"
 
     id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
-    item_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("wishlist_items.id", ondelete="CASCADE"), nullable=False)
+    item_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("wishlist_items.id", ondelete="CASCADE"), nullable=False, index=True)
     contributor_key: Mapped[str] = mapped_column(String(255), nullable=False)
     is_anonymous: Mapped[bool] = mapped_column(Boolean, default=True)
     amount: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     item: Mapped["WishlistItem"] = relationship("WishlistItem", back_populates="contributions")
+
+
+class PriceObservation(Base):
+    __tablename__ = "item_price_history"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    item_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("wishlist_items.id", ondelete="CASCADE"), nullable=False, index=True)
+    price: Mapped[Decimal] = mapped_column(Numeric(12, 2), nullable=False)
+    observed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,5 @@
 from decimal import Decimal
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from uuid import UUID
 
 
@@ -29,6 +29,7 @@ class WishlistItemPublic(BaseModel):
     url: str
     price: Decimal
     image_url: str | None
+    image_hash: str | None = None
     target_amount: Decimal | None
     reserved: bool
     reserved_by_me: bool
@@ -46,6 +47,7 @@ class WishlistItemOwner(BaseModel):
     url: str
     price: Decimal
     image_url: str | None
+    image_hash: str | None = None
     target_amount: Decimal | None
     reserved: bool
     total_contributed: Decimal
@@ -97,6 +99,10 @@ class WishlistListItem(BaseModel):
         from_attributes = True
 
 
+class WishlistBulkDelete(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=500)
+
+
 class ReserveRequest(BaseModel):
     anonymous_token: str | None = None
 
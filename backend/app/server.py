@@ -0,0 +1,43 @@
+"""Production entrypoint: ``python -m app.server``.
+
+uvicorn closes every open connection before the lifespan shutdown runs, so by
+the time the app could drain its WebSockets they are already gone, and every
+client reconnects at the same instant. This server drains them first.
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from app.core import lifecycle
+from app.core.config import settings
+from app.websocket.manager import manager
+
+
+class Server(uvicorn.Server):
+    async def shutdown(self, sockets=None) -> None:
+        # Stop accepting first; uvicorn's own shutdown repeats this harmlessly.
+        for server in self.servers:
+            server.close()
+        for sock in sockets or []:
+            sock.close()
+        lifecycle.state.ready = False
+        lifecycle.state.draining = True
+        await manager.drain()
+        await super().shutdown(sockets)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API with graceful WebSocket draining")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    args = parser.parse_args(argv)
+    config = uvicorn.Config(
+        "app.main:app", host=args.host, port=args.port, proxy_headers=True, forwarded_allow_ips=settings.forwarded_allow_ips
+    )
+    Server(config).run()
+
+
+if __name__ == "__main__":
+    main()
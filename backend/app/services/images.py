@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.wishlist import Wishlist, WishlistItem
+from app.services.scrape import BROWSER_HEADERS
+from app.websocket import outbox
+
+log = logging.getLogger(__name__)
+
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+def sizes() -> list[int]:
+    return sorted(int(s) for s in settings.image_sizes.split(",") if s.strip())
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _dir(digest: str) -> str:
+    return os.path.join(settings.image_cache_dir, digest[:2], digest)
+
+
+def cached(digest: str) -> bool:
+    """Whether the cache still holds this image; it is lost with the disk on a redeploy."""
+    return os.path.exists(os.path.join(_dir(digest), "original"))
+
+
+def _write(path: str, data: bytes) -> None:
+    # Write-then-rename so concurrent readers never see a partial file. Each
+    # writer gets its own temp file: two threads may store the same image.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@functools.cache
+def _pil():
+    """Import Pillow once, with the decode limit applied before anything is opened."""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = settings.image_max_pixels
+    return Image, ImageOps
+
+
+def _render(source: bytes, width: int, fmt: str) -> bytes:
+    Image, ImageOps = _pil()
+    with Image.open(io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        if fmt == "webp":
+            image.save(out, "WEBP", quality=settings.image_webp_quality, method=4)
+        else:
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(out, "JPEG", quality=settings.image_jpeg_quality, optimize=True, progressive=True)
+        return out.getvalue()
+
+
+def store(source: bytes, content_type: str) -> str:
+    """Put an original into the cache and pre-render every thumbnail. Returns its content hash."""
+    digest = hashlib.sha256(source).hexdigest()
+    directory = _dir(digest)
+    if cached(digest):
+        return digest
+    os.makedirs(directory, exist_ok=True)
+    if pillow_available():
+        for width in sizes():
+            for fmt in FORMATS:
+                _write(os.path.join(directory, f"{width}.{fmt}"), _render(source, width, fmt))
+    _write(os.path.join(directory, "meta.json"), json.dumps({"content_type": content_type}).encode())
+    # The original goes last: its presence marks the entry complete.
+    _write(os.path.join(directory, "original"), source)
+    return digest
+
+
+def variant(digest: str, width: int | None, accept: str) -> tuple[str, str, str] | None:
+    """(path, media type, etag) of the best cached file for a request, or None if unknown."""
+    directory = _dir(digest)
+    original = os.path.join(directory, "original")
+    if not cached(digest):
+        return None
+    available = sizes()
+    if pillow_available() and available:
+        width = next((w for w in available if width is None or w >= width), available[-1])
+        fmt = "webp" if "image/webp" in accept else "jpeg"
+        path = os.path.join(directory, f"{width}.{fmt}")
+        if not os.path.exists(path):
+            with open(original, "rb") as f:
+                _write(path, _render(f.read(), width, fmt))
+        return path, FORMATS[fmt], f'"{digest[:16]}-{width}.{fmt}"'
+    with open(os.path.join(directory, "meta.json")) as f:
+        content_type = json.load(f)["content_type"]
+    return original, content_type, f'"{digest[:16]}"'
+
+
+async def download(url: str, transport=None) -> tuple[bytes, str]:
+    import httpx
+
+    async with httpx.AsyncClient(
+        timeout=settings.image_fetch_timeout, follow_redirects=True, headers=BROWSER_HEADERS, transport=transport
+    ) as client:
+        async with client.stream("GET", url) as response:
+            if not response.is_success:
+                raise ImageFetchError(f"HTTP {response.status_code}")
+            content_type = response.headers.get("content-type", "").split(";")[0].strip()
+            if not content_type.startswith("image/"):
+                raise ImageFetchError(f"not an image: {content_type or 'no content type'}")
+            chunks, size = [], 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > settings.image_max_bytes:
+                    raise ImageFetchError("image too large")
+                chunks.append(chunk)
+    return b"".join(chunks), content_type
+
+
+async def ingest_item(item_id: UUID, url: str, session_factory=async_session, transport=None) -> str | None:
+    """Download an item's image once, cache its thumbnails and point the item at them."""
+    try:
+        source, content_type = await download(url, transport)
+        # Decoding and resizing are CPU-bound; keep them off the event loop.
+        digest = await asyncio.to_thread(store, source, content_type)
+    except Exception as exc:
+        log.info("Image ingest failed for %s: %s", url, exc)
+        return None
+    async with session_factory() as db:
+        row = (await db.execute(
+            select(WishlistItem, Wishlist.slug).join(Wishlist).where(WishlistItem.id == item_id)
+        )).one_or_none()
+        # Skip if the item is gone or its image changed while we were downloading.
+        if not row or row[0].image_url != url:
+            return digest
+        item, slug = row
+        if item.image_hash != digest:
+            item.image_hash = digest
+            outbox.publish(db, f"wishlist:{slug}", {"type": "item_updated", "itemId": str(item.id)})
+        await db.commit()
+    return digest
+
+
+_recovering: set[str] = set()
+
+
+async def source_of(db: AsyncSession, digest: str) -> tuple[UUID, str] | None:
+    """(item id, image_url) of an item still pointing at ``digest``, to rebuild a lost cache entry."""
+    row = (await db.execute(
+        select(WishlistItem.id, WishlistItem.image_url)
+        .where(WishlistItem.image_hash == digest, WishlistItem.image_url.is_not(None))
+        .limit(1)
+    )).first()
+    return (row.id, row.image_url) if row else None
+
+
+async def recover(digest: str, item_id: UUID, url: str, session_factory=async_session, transport=None) -> str | None:
+    """Re-ingest an image whose cache entry is gone, once per digest at a time."""
+    if digest in _recovering:
+        return None
+    _recovering.add(digest)
+    try:
+        return await ingest_item(item_id, url, session_factory, transport)
+    finally:
+        _recovering.discard(digest)
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+from uuid import UUID
+
+from sqlalchemy import or_, select
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.wishlist import PriceObservation, Wishlist, WishlistItem
+from app.services import images
+from app.services.scrape import BROWSER_HEADERS, extract_meta
+from app.websocket import outbox
+
+log = logging.getLogger(__name__)
+
+
+class _HostGate:
+    """At most ``concurrency`` requests to one host, started at least ``delay`` seconds apart."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self.lock:
+            wait = self.next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.next_start = time.monotonic() + self.delay
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class PriceRefresher:
+    """Periodically re-scrapes item pages and records price changes.
+
+    ``session_factory`` and ``transport`` are injectable so tests can run it
+    against a stand-in HTTP server.
+    """
+
+    def __init__(self, session_factory=async_session, transport=None):
+        self.session_factory = session_factory
+        self.transport = transport
+
+    async def _due(self) -> list[tuple[UUID, str, str | None, str | None]]:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.price_refresh_max_age)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(WishlistItem.id, WishlistItem.url, WishlistItem.fetch_etag, WishlistItem.fetch_last_modified)
+                .where(or_(WishlistItem.price_checked_at.is_(None), WishlistItem.price_checked_at < cutoff))
+                # Filtered here, not after LIMIT: unfetchable rows never get
+                # price_checked_at and would otherwise fill every batch.
+                .where(or_(WishlistItem.url.ilike("http://%"), WishlistItem.url.ilike("https://%")))
+                .order_by(WishlistItem.price_checked_at.asc().nullsfirst())
+                .limit(settings.price_refresh_batch)
+            )
+            return [tuple(row) for row in result.all()]
+
+    async def _fetch(self, client, gate: _HostGate, url: str, etag: str | None, last_modified: str | None):
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        host = urlparse(url).hostname or ""
+        async with gate:
+            started = time.perf_counter()
+            try:
+                return await client.get(url, headers=headers)
+            finally:
+                metrics.outbound_fetch_duration.observe(time.perf_counter() - started, host=host)
+
+    async def _apply(self, item_id: UUID, response, meta) -> tuple[str, str | None]:
+        async with self.session_factory() as db:
+            row = (await db.execute(
+                select(WishlistItem, Wishlist.slug).join(Wishlist).where(WishlistItem.id == item_id)
+            )).one_or_none()
+            if not row:
+                return "gone", None
+            item, slug = row
+            item.price_checked_at = datetime.utcnow()
+            outcome, new_image = "failed", None
+            if response is not None and response.status_code == 304:
+                outcome = "not_modified"
+            elif response is not None and response.is_success:
+                outcome = "unchanged"
+                item.fetch_etag = response.headers.get("etag")
+                item.fetch_last_modified = response.headers.get("last-modified")
+                _, image_url, price = meta
+                if price is not None:
+                    db.add(PriceObservation(item_id=item.id, price=price))
+                    if price != item.price:
+                        item.price = price
+                        outcome = "changed"
+                if image_url and image_url != item.image_url:
+                    item.image_url = image_url
+                    item.image_hash = None
+                    new_image = image_url
+                    outcome = "changed"
+                if outcome == "changed":
+                    outbox.publish(db, f"wishlist:{slug}", {"type": "item_updated", "itemId": str(item.id)})
+            # Backfill items added before the image cache existed, or whose
+            # cache entry was lost with the disk.
+            if not new_image and item.image_url and (not item.image_hash or not images.cached(item.image_hash)):
+                new_image = item.image_url
+            await db.commit()
+        return outcome, new_image
+
+    async def refresh_once(self) -> dict[str, int]:
+        """Re-check one batch of the stalest items. Returns counts by outcome."""
+        import httpx
+
+        due = await self._due()
+        gates: dict[str, _HostGate] = defaultdict(
+            lambda: _HostGate(settings.price_refresh_per_host, settings.price_refresh_host_delay)
+        )
+        counts: dict[str, int] = defaultdict(int)
+
+        async with httpx.AsyncClient(
+            timeout=settings.price_refresh_timeout,
+            follow_redirects=True,
+            headers=BROWSER_HEADERS,
+            transport=self.transport,
+        ) as client:
+
+            async def refresh(item_id: UUID, url: str, etag: str | None, last_modified: str | None) -> None:
+                try:
+                    response = await self._fetch(client, gates[urlparse(url).hostname or ""], url, etag, last_modified)
+                except httpx.HTTPError as exc:
+                    log.info("Price refresh fetch failed for %s: %s", url, exc)
+                    response = None
+                meta = None
+                if response is not None and response.is_success:
+                    meta = await asyncio.to_thread(extract_meta, response.text, str(response.url))
+                outcome, new_image = await self._apply(item_id, response, meta)
+                if new_image:
+                    await images.ingest_item(item_id, new_image, self.session_factory, self.transport)
+                counts[outcome] += 1
+                metrics.price_refreshes.inc(outcome=outcome)
+
+            await asyncio.gather(*(refresh(*row) for row in due))
+        await outbox.flush()
+        return dict(counts)
+
+    async def run(self) -> None:
+        while True:
+            # Jitter so several workers do not sweep in lockstep.
+            await asyncio.sleep(settings.price_refresh_interval * random.uniform(0.8, 1.2))
+            try:
+                counts = await self.refresh_once()
+                if counts:
+                    log.info("Price refresh: %s", counts)
+            except Exception:
+                log.exception("Price refresh sweep failed")
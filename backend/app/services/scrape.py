@@ -0,0 +1,113 @@
+import re
+from decimal import Decimal
+from urllib.parse import urlparse
+
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,cs;q=0.8,ru;q=0.7",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Cache-Control": "no-cache",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+def parse_price(text: str) -> Decimal | None:
+    if not text:
+        return None
+    nums = re.findall(r"[\d\s.,]+", text)
+    if not nums:
+        return None
+    s = nums[0].replace("\xa0", "").replace(" ", "").replace(",", ".")
+    parts = re.findall(r"[\d.]+", s)
+    if not parts:
+        return None
+    try:
+        return Decimal(parts[0])
+    except Exception:
+        return None
+
+
+def extract_meta(html: str, url: str) -> tuple[str | None, str | None, Decimal | None]:
+    """Title, image URL and price scraped from a product page."""
+    # Imported on first use: scraping is rare and bs4 dominates cold-start import time.
+    from bs4 import BeautifulSoup
+
+    parsed = urlparse(url)
+    soup = BeautifulSoup(html, "html.parser")
+    title = None
+    image_url = None
+    price = None
+
+    # --- title ---
+    og_title = soup.find("meta", property="og:title")
+    if og_title and og_title.get("content"):
+        title = og_title["content"].strip()
+    if not title:
+        t = soup.find("title")
+        if t:
+            title = t.get_text(strip=True)
+    if not title:
+        desc = soup.find("meta", attrs={"name": "description"})
+        if desc and desc.get("content"):
+            title = desc["content"][:200]
+
+    # --- image ---
+    og_image = soup.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        img = og_image["content"]
+        if img.startswith("//"):
+            img = "https:" + img
+        elif img.startswith("/"):
+            img = f"{parsed.scheme}://{parsed.netloc}{img}"
+        image_url = img
+
+    # --- price ---
+    # 1) product:price:amount meta
+    og_price = soup.find("meta", property="product:price:amount")
+    if og_price and og_price.get("content"):
+        price = parse_price(og_price["content"])
+    # 2) og:price:amount meta
+    if price is None:
+        price_elem = soup.find("meta", property="og:price:amount")
+        if price_elem and price_elem.get("content"):
+            price = parse_price(price_elem["content"])
+    # 3) schema.org JSON-LD
+    if price is None:
+        import json as _json
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                ld = _json.loads(script.string or "")
+                items = ld if isinstance(ld, list) else [ld]
+                for item in items:
+                    offers = item.get("offers") or item.get("Offers")
+                    if isinstance(offers, list):
+                        offers = offers[0] if offers else {}
+                    if isinstance(offers, dict):
+                        p = offers.get("price") or offers.get("lowPrice")
+                        if p is not None:
+                            price = parse_price(str(p))
+                            break
+                if price is not None:
+                    break
+            except Exception:
+                continue
+    # 4) text patterns (RUB, CZK, EUR, USD, etc.)
+    if price is None:
+        for elem in soup.find_all(
+            string=re.compile(r"[\d\s.,]+\s*(?:р\.|руб|₽|Kč|CZK|EUR|USD|\$|€|£)")
+        ):
+            p = parse_price(elem)
+            if p and p > 0:
+                price = p
+                break
+
+    return title, image_url, price
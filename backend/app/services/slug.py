@@ -1,19 +1,48 @@
 import secrets
 import string
-from sqlalchemy import select
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import dialect_insert
+from app.core.metrics import slug_collisions
 from app.models.wishlist import Wishlist
 
+SLUG_ALPHABET = string.ascii_lowercase + string.digits
+SLUG_LENGTH = 12
+MAX_SLUG_ATTEMPTS = 5
+
+# 80 random bits cover 36**12 (~2**62) with negligible modulo bias.
+_SLUG_ENTROPY_BYTES = 10
+
+
+class SlugAllocationError(Exception):
+    """Raised when no free slug was found within MAX_SLUG_ATTEMPTS."""
+    pass
+
 
 def generate_slug() -> str:
-    alphabet = string.ascii_lowercase + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(12))
+    n = int.from_bytes(secrets.token_bytes(_SLUG_ENTROPY_BYTES), "big")
+    chars = []
+    for _ in range(SLUG_LENGTH):
+        n, r = divmod(n, len(SLUG_ALPHABET))
+        chars.append(SLUG_ALPHABET[r])
+    return "".join(chars)
 
 
-async def get_unique_slug(db: AsyncSession) -> str:
-    while True:
-        slug = generate_slug()
-        result = await db.execute(select(Wishlist).where(Wishlist.slug == slug))
-        if result.scalar_one_or_none() is None:
-            return slug
+async def insert_wishlist_with_unique_slug(db: AsyncSession, user_id: UUID, name: str, occasion: str) -> Wishlist:
+    # Relies on the unique index on wishlists.slug: a collision inserts nothing
+    # instead of raising, so the surrounding transaction stays usable.
+    for _ in range(MAX_SLUG_ATTEMPTS):
+        stmt = (
+            dialect_insert(db, Wishlist)
+            .values(user_id=user_id, name=name, occasion=occasion, slug=generate_slug())
+            .on_conflict_do_nothing(index_elements=[Wishlist.slug])
+            .returning(Wishlist)
+        )
+        result = await db.execute(stmt)
+        wishlist = result.scalar_one_or_none()
+        if wishlist is not None:
+            return wishlist
+        slug_collisions.inc()
+    raise SlugAllocationError()
@@ -1,14 +1,24 @@
+from datetime import datetime
 from decimal import Decimal
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select, func, delete
+from sqlalchemy import Boolean, DateTime, String, Uuid, select, func, delete, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.schema import UniqueConstraint
 
+from app.core.database import dialect_insert
 from app.models.wishlist import Wishlist, WishlistItem, Reservation, Contribution
 from app.schemas.wishlist import WishlistItemCreate, WishlistItemUpdate
-from app.services.slug import get_unique_slug
+from app.services.slug import insert_wishlist_with_unique_slug
+from app.websocket import outbox
+
+
+def _notify(db: AsyncSession, slug: str, kind: str, item_id: UUID | None = None) -> None:
+    message = {"type": kind}
+    if item_id is not None:
+        message["itemId"] = str(item_id)
+    outbox.publish(db, f"wishlist:{slug}", message)
 
 
 async def get_my_wishlists(db: AsyncSession, user_id: UUID) -> list[Wishlist]:
@@ -40,11 +50,7 @@ async def get_wishlist_by_slug(db: AsyncSession, slug: str) -> Wishlist | None:
 
 
 async def create_wishlist(db: AsyncSession, user_id: UUID, name: str, occasion: str) -> Wishlist:
-    slug = await get_unique_slug(db)
-    wishlist = Wishlist(user_id=user_id, name=name, occasion=occasion, slug=slug)
-    db.add(wishlist)
-    await db.flush()
-    return wishlist
+    return await insert_wishlist_with_unique_slug(db, user_id, name, occasion)
 
 
 async def add_item(db: AsyncSession, wishlist_id: UUID, user_id: UUID, data: WishlistItemCreate) -> WishlistItem | None:
@@ -57,51 +63,68 @@ async def add_item(db: AsyncSession, wishlist_id: UUID, user_id: UUID, data: Wis
     await db.flush()
     # Eagerly load relationships needed by _owner_item() to avoid lazy-load in async context
     await db.refresh(item, attribute_names=["reservations", "contributions"])
+    _notify(db, wishlist.slug, "item_added", item.id)
     return item
 
 
 async def update_item(db: AsyncSession, wishlist_id: UUID, item_id: UUID, user_id: UUID, data: WishlistItemUpdate) -> WishlistItem | None:
     result = await db.execute(
-        select(WishlistItem).join(Wishlist).where(
+        select(WishlistItem, Wishlist.slug).join(Wishlist).where(
             WishlistItem.id == item_id, Wishlist.id == wishlist_id, Wishlist.user_id == user_id
         )
     )
-    item = result.scalar_one_or_none()
-    if not item:
+    row = result.one_or_none()
+    if not row:
         return None
-    for k, v in data.model_dump(exclude_unset=True).items():
+    item, slug = row
+    changes = data.model_dump(exclude_unset=True)
+    if "image_url" in changes and changes["image_url"] != item.image_url:
+        item.image_hash = None
+    for k, v in changes.items():
         setattr(item, k, v)
     await db.flush()
     await db.refresh(item, attribute_names=["reservations", "contributions"])
+    _notify(db, slug, "item_updated", item.id)
     return item
 
 
-async def delete_wishlist(db: AsyncSession, wishlist_id: UUID, user_id: UUID) -> bool:
+async def delete_wishlists(db: AsyncSession, wishlist_ids: list[UUID], user_id: UUID) -> list[str]:
+    """Delete the user's wishlists in one statement; items and their rows go by ON DELETE CASCADE."""
+    if not wishlist_ids:
+        return []
     result = await db.execute(
-        select(Wishlist).where(Wishlist.id == wishlist_id, Wishlist.user_id == user_id)
+        delete(Wishlist)
+        .where(Wishlist.id.in_(wishlist_ids), Wishlist.user_id == user_id)
+        .returning(Wishlist.slug)
+        .execution_options(synchronize_session=False)
     )
-    wishlist = result.scalar_one_or_none()
-    if not wishlist:
-        return False
-    await db.delete(wishlist)
-    return True
+    slugs = list(result.scalars())
+    for slug in slugs:
+        _notify(db, slug, "wishlist_deleted")
+    return slugs
+
+
+async def delete_wishlist(db: AsyncSession, wishlist_id: UUID, user_id: UUID) -> bool:
+    return bool(await delete_wishlists(db, [wishlist_id], user_id))
 
 
 async def delete_item(db: AsyncSession, wishlist_id: UUID, item_id: UUID, user_id: UUID) -> bool:
+    owned = select(Wishlist.id).where(Wishlist.id == wishlist_id, Wishlist.user_id == user_id)
+    has_contributions = select(Contribution.id).where(Contribution.item_id == item_id).exists()
     result = await db.execute(
-        select(WishlistItem)
-        .options(selectinload(WishlistItem.contributions))
-        .join(Wishlist)
-        .where(
-            WishlistItem.id == item_id, Wishlist.id == wishlist_id, Wishlist.user_id == user_id
-        )
+        delete(WishlistItem)
+        .where(WishlistItem.id == item_id, WishlistItem.wishlist_id.in_(owned), ~has_contributions)
+        .returning(select(Wishlist.slug).where(Wishlist.id == WishlistItem.wishlist_id).scalar_subquery())
+        .execution_options(synchronize_session=False)
     )
-    item = result.scalar_one_or_none()
-    if not item:
+    slug = result.scalar_one_or_none()
+    if slug is None:
+        # Only the failure path pays for a second query, to tell the two cases apart.
+        exists = await db.scalar(select(WishlistItem.id).where(WishlistItem.id == item_id, WishlistItem.wishlist_id.in_(owned)))
+        if exists:
+            raise ValueError("Cannot delete item with contributions")
         return False
-    if item.contributions:
-        raise ValueError("Cannot delete item with contributions")
-    await db.delete(item)
+    _notify(db, slug, "item_deleted", item_id)
     return True
 
 
@@ -109,32 +132,43 @@ async def get_reserver_key(email: str | None, anonymous_token: str | None) -> st
     return email if email else (anonymous_token or "")
 
 
-async def reserve_item(db: AsyncSession, slug: str, item_id: UUID, reserver_key: str, is_anonymous: bool) -> WishlistItem | None:
-    result = await db.execute(
-        select(WishlistItem).join(Wishlist).where(Wishlist.slug == slug, WishlistItem.id == item_id)
+async def reserve_item(db: AsyncSession, slug: str, item_id: UUID, reserver_key: str, is_anonymous: bool) -> bool:
+    # One statement: the SELECT yields a row only if the item belongs to the
+    # wishlist, and the unique item_id constraint turns a lost race into a no-op.
+    # SQLite needs the WHERE clause here to parse ON CONFLICT after INSERT ... SELECT.
+    source = (
+        select(
+            literal(uuid4(), Uuid),
+            WishlistItem.id,
+            literal(reserver_key, String),
+            literal(is_anonymous, Boolean),
+            literal(datetime.utcnow(), DateTime),
+        )
+        .join(Wishlist)
+        .where(Wishlist.slug == slug, WishlistItem.id == item_id)
     )
-    item = result.scalar_one_or_none()
-    if not item:
-        return None
-    existing = await db.execute(select(Reservation).where(Reservation.item_id == item_id))
-    if existing.scalar_one_or_none():
-        return None
-    reservation = Reservation(item_id=item_id, reserver_key=reserver_key, is_anonymous=is_anonymous)
-    db.add(reservation)
-    await db.flush()
-    return item
+    stmt = (
+        dialect_insert(db, Reservation)
+        .from_select(["id", "item_id", "reserver_key", "is_anonymous", "created_at"], source)
+        .on_conflict_do_nothing(index_elements=[Reservation.item_id])
+        .returning(Reservation.id)
+    )
+    if (await db.execute(stmt)).first() is None:
+        return False
+    _notify(db, slug, "reservation", item_id)
+    return True
 
 
 async def unreserve_item(db: AsyncSession, slug: str, item_id: UUID, reserver_key: str) -> bool:
-    result = await db.execute(
-        select(Reservation).join(WishlistItem).join(Wishlist).where(
-            Wishlist.slug == slug, WishlistItem.id == item_id, Reservation.reserver_key == reserver_key
-        )
+    in_wishlist = select(WishlistItem.id).join(Wishlist).where(Wishlist.slug == slug, WishlistItem.id == item_id)
+    stmt = (
+        delete(Reservation)
+        .where(Reservation.item_id.in_(in_wishlist), Reservation.reserver_key == reserver_key)
+        .returning(Reservation.id)
     )
-    reservation = result.scalar_one_or_none()
-    if not reservation:
+    if (await db.execute(stmt)).first() is None:
         return False
-    await db.delete(reservation)
+    _notify(db, slug, "unreserve", item_id)
     return True
 
 
@@ -165,6 +199,7 @@ async def contribute_item(db: AsyncSession, slug: str, item_id: UUID, contributo
     if item.reservations:
         raise ItemAlreadyReserved()
     contribution = Contribution(item_id=item_id, contributor_key=contributor_key, amount=amount, is_anonymous=is_anonymous)
-    db.add(contribution)
+    item.contributions.append(contribution)
     await db.flush()
+    _notify(db, slug, "contribution", item_id)
     return item
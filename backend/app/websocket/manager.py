@@ -1,29 +1,234 @@
+import asyncio
 import json
-from collections import defaultdict
+import logging
+import random
+from collections import OrderedDict, defaultdict, deque
+from time import monotonic, perf_counter
 
 from fastapi import WebSocket
 
+from app.core import metrics, tracing
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+# 1013 "Try Again Later": the server is at capacity.
+CLOSE_OVERLOADED = 1013
+# 1001 "Going Away": evicted for not answering pings.
+CLOSE_UNRESPONSIVE = 1001
+# Application code mirroring 1012 "Service Restart"; the close reason is the
+# number of milliseconds the client should wait before reconnecting.
+CLOSE_RESTARTING = 4012
+
+PING = json.dumps({"type": "ping"})
+
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, max_connections: int | None = None, max_per_channel: int | None = None):
         self._channels: dict[str, set[WebSocket]] = defaultdict(set)
+        self._subscriptions: dict[WebSocket, set[str]] = {}
+        self._last_seen: dict[WebSocket, float] = {}
+        # Per channel: last sequence number and the most recent (seq, payload) pairs, LRU by channel.
+        self._history: OrderedDict[str, tuple[int, deque]] = OrderedDict()
+        self.max_connections = settings.ws_max_connections if max_connections is None else max_connections
+        self.max_per_channel = settings.ws_max_connections_per_channel if max_per_channel is None else max_per_channel
+        self.draining = False
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._last_seen)
+
+    def register(self, subscriber) -> bool:
+        """Track any object with ``send_text``/``close``, e.g. an SSE stream, like a socket."""
+        if self.draining:
+            return False
+        if self.connection_count >= self.max_connections:
+            metrics.websocket_rejected.inc()
+            return False
+        self._last_seen[subscriber] = monotonic()
+        self._subscriptions[subscriber] = set()
+        metrics.websocket_connections.set(self.connection_count)
+        return True
 
-    async def connect(self, websocket: WebSocket, channel: str) -> None:
+    async def accept(self, websocket: WebSocket) -> bool:
         await websocket.accept()
+        if self.draining:
+            await websocket.close(code=CLOSE_RESTARTING, reason=str(self.reconnect_hint()))
+            return False
+        if not self.register(websocket):
+            await websocket.close(code=CLOSE_OVERLOADED)
+            return False
+        return True
+
+    def subscribe(self, websocket: WebSocket, channel: str) -> bool:
+        sockets = self._channels.get(channel, set())
+        if websocket in sockets:
+            return True
+        if len(sockets) >= self.max_per_channel:
+            metrics.websocket_rejected.inc()
+            return False
         self._channels[channel].add(websocket)
+        self._subscriptions[websocket].add(channel)
+        metrics.websocket_channels.set(len(self._channels))
+        return True
 
-    def disconnect(self, websocket: WebSocket, channel: str) -> None:
-        self._channels[channel].discard(websocket)
-        if not self._channels[channel]:
+    def unsubscribe(self, websocket: WebSocket, channel: str) -> None:
+        self._subscriptions.get(websocket, set()).discard(channel)
+        sockets = self._channels.get(channel)
+        if sockets is None:
+            return
+        sockets.discard(websocket)
+        if not sockets:
             del self._channels[channel]
+            metrics.websocket_channels.set(len(self._channels))
+
+    def subscriptions(self, websocket: WebSocket) -> set[str]:
+        return self._subscriptions.get(websocket, set())
+
+    async def connect(self, websocket: WebSocket, channel: str) -> bool:
+        if not await self.accept(websocket):
+            return False
+        if not self.subscribe(websocket, channel):
+            self.disconnect(websocket)
+            await websocket.close(code=CLOSE_OVERLOADED)
+            return False
+        return True
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        self._last_seen.pop(websocket, None)
+        for channel in list(self._subscriptions.get(websocket, ())):
+            self.unsubscribe(websocket, channel)
+        self._subscriptions.pop(websocket, None)
+        metrics.websocket_connections.set(self.connection_count)
+
+    def touch(self, websocket: WebSocket) -> None:
+        if websocket in self._last_seen:
+            self._last_seen[websocket] = monotonic()
+
+    def last_seq(self, channel: str) -> int:
+        entry = self._history.get(channel)
+        return entry[0] if entry else 0
+
+    def _record(self, channel: str, message: dict) -> str:
+        seq, buffer = self._history.pop(channel, (0, None))
+        if buffer is None:
+            buffer = deque(maxlen=settings.ws_replay_buffer)
+        seq += 1
+        # Tag every event with its channel so one socket can carry many.
+        payload = json.dumps({**message, "channel": channel, "seq": seq}, default=str)
+        buffer.append((seq, payload))
+        self._history[channel] = (seq, buffer)
+        while len(self._history) > settings.ws_replay_channels:
+            self._history.popitem(last=False)
+        return payload
+
+    def replay(self, channel: str, since: int) -> list[str] | None:
+        """Events published on ``channel`` after ``since``, or None when they are no longer buffered."""
+        seq, buffer = self._history.get(channel, (0, ()))
+        if since == seq:
+            return []
+        if since > seq or not buffer or buffer[0][0] > since + 1:
+            return None
+        return [payload for s, payload in buffer if s > since]
 
     async def broadcast(self, channel: str, message: dict) -> None:
-        payload = json.dumps(message, default=str)
-        for ws in list(self._channels.get(channel, [])):
+        with tracing.span("ws.broadcast", **{"ws.channel": channel, "ws.event": message.get("type")}) as span:
+            if span is not None:
+                # Lets a client tie an event back to the request that caused it.
+                message = {**message, "traceId": span.trace_id}
+            payload = self._record(channel, message)
+            recipients = list(self._channels.get(channel, []))
+            started = perf_counter()
+            for ws in recipients:
+                try:
+                    await ws.send_text(payload)
+                except Exception:
+                    self.disconnect(ws)
+            metrics.websocket_broadcast_duration.observe(perf_counter() - started)
+            if span is not None:
+                span.set(**{"ws.recipients": len(recipients)})
+
+    async def catch_up(self, websocket: WebSocket, channel: str, since: int | None) -> None:
+        """Send what a reconnecting client missed, or tell it to refetch."""
+        if since is None:
+            return
+        missed = self.replay(channel, since)
+        if missed is None:
+            await websocket.send_text(json.dumps({"type": "resync", "channel": channel, "seq": self.last_seq(channel)}))
+            return
+        for payload in missed:
+            await websocket.send_text(payload)
+
+    async def reap(self, timeout: float | None = None, now: float | None = None) -> tuple[int, int]:
+        """Evict sockets silent for longer than ``timeout`` and ping the rest.
+
+        Returns the connection count before and after the sweep.
+        """
+        timeout = settings.ws_pong_timeout if timeout is None else timeout
+        now = monotonic() if now is None else now
+        before = self.connection_count
+        for ws, last_seen in list(self._last_seen.items()):
+            if now - last_seen > timeout:
+                self.disconnect(ws)
+                metrics.websocket_reaped.inc()
+                try:
+                    await ws.close(code=CLOSE_UNRESPONSIVE)
+                except Exception:
+                    pass
+                continue
+            try:
+                await ws.send_text(PING)
+            except Exception:
+                self.disconnect(ws)
+                metrics.websocket_reaped.inc()
+        after = self.connection_count
+        if before != after:
+            log.info("Reaped WebSocket connections: %d before, %d after", before, after)
+        return before, after
+
+    def reconnect_hint(self) -> int:
+        return random.randint(settings.ws_reconnect_min_ms, settings.ws_reconnect_max_ms)
+
+    async def _close_for_restart(self, websocket: WebSocket) -> None:
+        self.disconnect(websocket)
+        await websocket.close(code=CLOSE_RESTARTING, reason=str(self.reconnect_hint()))
+
+    async def drain(self, timeout: float | None = None, batch_size: int | None = None) -> int:
+        """Refuse new sockets, then close the live ones in batches spread over ``timeout`` seconds.
+
+        Every socket gets CLOSE_RESTARTING with its own random reconnect delay,
+        so clients do not all come back, and hit the database, at once.
+        Returns the number of sockets closed.
+        """
+        timeout = settings.ws_drain_timeout if timeout is None else timeout
+        batch_size = settings.ws_drain_batch_size if batch_size is None else batch_size
+        self.draining = True
+        sockets = list(self._last_seen)
+        batches = [sockets[i:i + batch_size] for i in range(0, len(sockets), batch_size)]
+        started = monotonic()
+        deadline = started + timeout
+        pause = timeout / len(batches) if batches else 0.0
+        for i, batch in enumerate(batches):
+            wait = started + i * pause - monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            budget = max(deadline - monotonic(), 0.05)
+            await asyncio.gather(
+                *(asyncio.wait_for(self._close_for_restart(ws), budget) for ws in batch),
+                return_exceptions=True,
+            )
+        if sockets:
+            log.info("Drained %d WebSocket connection(s) in %.1fs", len(sockets), monotonic() - started)
+        return len(sockets)
+
+    async def run_reaper(self, interval: float | None = None) -> None:
+        interval = settings.ws_ping_interval if interval is None else interval
+        while True:
+            await asyncio.sleep(interval)
             try:
-                await ws.send_text(payload)
+                await self.reap()
             except Exception:
-                self._channels[channel].discard(ws)
+                log.exception("WebSocket reaper failed")
 
 
 manager = ConnectionManager()
@@ -0,0 +1,47 @@
+import asyncio
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.websocket.manager import manager
+
+log = logging.getLogger(__name__)
+
+_OUTBOX = "outbox"
+_pending: set[asyncio.Task] = set()
+
+
+def publish(db: AsyncSession, channel: str, message: dict) -> None:
+    """Queue a broadcast that goes out only once ``db`` commits."""
+    db.sync_session.info.setdefault(_OUTBOX, []).append((channel, message))
+
+
+async def _dispatch(events: list[tuple[str, dict]]) -> None:
+    for channel, message in events:
+        try:
+            await manager.broadcast(channel, message)
+        except Exception:
+            log.exception("Broadcast to %s failed", channel)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    events = session.info.pop(_OUTBOX, None)
+    if not events:
+        return
+    task = asyncio.get_running_loop().create_task(_dispatch(events))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_OUTBOX, None)
+
+
+async def flush() -> None:
+    """Wait for broadcasts already handed off by committed sessions."""
+    while _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
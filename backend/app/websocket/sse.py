@@ -0,0 +1,78 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from app.core.config import settings
+from app.websocket.manager import CLOSE_RESTARTING, PING, manager
+
+
+class SSESubscriber:
+    """Queue-backed stand-in for a WebSocket in ``ConnectionManager``."""
+
+    def __init__(self, maxsize: int = 256):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize)
+        self.closed = False
+        self.retry_ms: int | None = None
+
+    async def send_text(self, payload: str) -> None:
+        if payload == PING:
+            # Liveness is proven by heartbeat writes, not pongs.
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.closed = True
+            raise
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed = True
+        if code == CLOSE_RESTARTING and reason:
+            self.retry_ms = int(reason)
+        try:
+            # Wake the stream now rather than at its next heartbeat.
+            self.queue.put_nowait("")
+        except asyncio.QueueFull:
+            pass
+
+
+def _event(payload: str) -> str:
+    message = json.loads(payload)
+    return f"id: {message['seq']}\nevent: {message['type']}\ndata: {payload}\n\n"
+
+
+async def stream(channel: str, since: int | None, heartbeat: float | None = None) -> AsyncIterator[str]:
+    heartbeat = settings.sse_heartbeat_interval if heartbeat is None else heartbeat
+    if manager.draining:
+        yield f"retry: {manager.reconnect_hint()}\n\n"
+        return
+    subscriber = SSESubscriber()
+    if not manager.register(subscriber) or not manager.subscribe(subscriber, channel):
+        manager.disconnect(subscriber)
+        yield "event: overloaded\ndata: {}\n\n"
+        return
+    # Take the replay before the first yield so nothing lands in both it and the queue.
+    missed = manager.replay(channel, since) if since is not None else []
+    try:
+        yield f"retry: {settings.sse_retry_ms}\n\n"
+        if missed is None:
+            seq = manager.last_seq(channel)
+            yield f"id: {seq}\nevent: resync\ndata: {json.dumps({'type': 'resync', 'channel': channel, 'seq': seq})}\n\n"
+        else:
+            for payload in missed:
+                yield _event(payload)
+        while not subscriber.closed:
+            try:
+                payload = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                manager.touch(subscriber)
+                continue
+            if not payload:
+                break
+            yield _event(payload)
+            manager.touch(subscriber)
+        if subscriber.retry_ms is not None:
+            # EventSource reconnects on its own; this spreads those reconnects out.
+            yield f"retry: {subscriber.retry_ms}\n\n"
+    finally:
+        manager.disconnect(subscriber)
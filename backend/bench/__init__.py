@@ -0,0 +1,4 @@
+"""Load benchmarks for the API's hot paths.
+
+Run ``python -m bench --help`` from the backend directory.
+"""
@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import sys
+
+from bench.harness import Bench, ScenarioFailed, compare, dump, environment, load, open_client
+from bench.scenarios import SCENARIOS
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Load benchmarks for the wishlist API")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the app in-process")
+    parser.add_argument("--database-url", help="Database for in-process runs (default: temporary SQLite)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="Fail if the run regressed against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default: 0.2)")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+async def run(args: argparse.Namespace) -> dict:
+    names = args.scenarios or list(SCENARIOS)
+    report = {
+        "environment": environment(args.base_url or "in-process", args.database_url, args.concurrency, args.requests),
+        "scenarios": {},
+    }
+    async with open_client(args.base_url, args.database_url) as client:
+        bench = Bench(client, args.concurrency, args.requests)
+        for name in names:
+            result = await SCENARIOS[name](bench)
+            report["scenarios"][name] = result.summary()
+            print(f"{name}: {report['scenarios'][name]}", file=sys.stderr)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    try:
+        report = asyncio.run(run(args))
+    except ScenarioFailed as exc:
+        print(f"FAILED {exc}", file=sys.stderr)
+        return 1
+    dump(report, args.out)
+    if args.compare:
+        regressions = compare(load(args.compare), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
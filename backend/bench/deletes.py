@@ -0,0 +1,126 @@
+"""Microbenchmark: deleting a 5,000-item wishlist.
+
+Compares the ORM cascade (load every item, reservation and contribution,
+then DELETE them row by row) with the single bulk DELETE that leaves the
+children to ON DELETE CASCADE. Run ``python -m bench.deletes``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app import models  # noqa: F401
+from app.core.database import Base, count_queries, enforce_foreign_keys
+from app.models.user import User
+from app.models.wishlist import Contribution, Reservation, Wishlist, WishlistItem
+from app.services import wishlist as wishlist_service
+
+
+async def seed(session: async_sessionmaker, user_id, items: int):
+    wishlist_id = uuid4()
+    item_ids = [uuid4() for _ in range(items)]
+    async with session() as db:
+        await db.execute(insert(Wishlist).values(id=wishlist_id, user_id=user_id, name="Bench", occasion="Bench", slug=uuid4().hex[:12]))
+        await db.execute(insert(WishlistItem), [
+            {"id": item_id, "wishlist_id": wishlist_id, "name": f"Item {i}", "url": "https://example.com", "price": Decimal("100")}
+            for i, item_id in enumerate(item_ids)
+        ])
+        await db.execute(insert(Reservation), [
+            {"id": uuid4(), "item_id": item_id, "reserver_key": f"guest-{i}"} for i, item_id in enumerate(item_ids[::4])
+        ])
+        await db.execute(insert(Contribution), [
+            {"id": uuid4(), "item_id": item_id, "contributor_key": f"donor-{i}", "amount": Decimal("5")}
+            for i, item_id in enumerate(item_ids[1::4])
+        ])
+        await db.commit()
+    return wishlist_id
+
+
+async def orm_cascade(db: AsyncSession, wishlist_id, user_id) -> None:
+    # What cascade="all, delete-orphan" without passive_deletes did: load the
+    # whole tree, then let the unit of work delete each loaded row.
+    wishlist = (await db.execute(
+        select(Wishlist)
+        .options(selectinload(Wishlist.items).selectinload(WishlistItem.reservations))
+        .options(selectinload(Wishlist.items).selectinload(WishlistItem.contributions))
+        .where(Wishlist.id == wishlist_id, Wishlist.user_id == user_id)
+    )).scalar_one()
+    await db.delete(wishlist)
+    await db.flush()
+
+
+async def bulk(db: AsyncSession, wishlist_id, user_id) -> None:
+    assert await wishlist_service.delete_wishlist(db, wishlist_id, user_id)
+
+
+async def measure(session: async_sessionmaker, fn, user_id, items: int, rounds: int) -> tuple[float, int]:
+    elapsed, queries = [], 0
+    for _ in range(rounds):
+        wishlist_id = await seed(session, user_id, items)
+        async with session() as db:
+            with count_queries() as counter:
+                started = time.perf_counter()
+                await fn(db, wishlist_id, user_id)
+                await db.commit()
+                elapsed.append(time.perf_counter() - started)
+            queries = counter.count
+            assert await db.scalar(select(func.count()).select_from(WishlistItem)) == 0
+    return min(elapsed), queries
+
+
+async def run(database_url: str | None, items: int, rounds: int) -> dict:
+    tmpdir = None
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix="wishlist-bench-")
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'deletes.db')}"
+    engine = create_async_engine(database_url)
+    enforce_foreign_keys(engine)
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        user_id = uuid4()
+        async with session() as db:
+            db.add(User(id=user_id, email=f"{user_id}@bench", password_hash="x"))
+            await db.commit()
+        orm_s, orm_queries = await measure(session, orm_cascade, user_id, items, rounds)
+        bulk_s, bulk_queries = await measure(session, bulk, user_id, items, rounds)
+    finally:
+        await engine.dispose()
+        if tmpdir:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+    return {
+        "items": items,
+        "orm_cascade_ms": round(orm_s * 1000, 1),
+        "orm_cascade_queries": orm_queries,
+        "bulk_ms": round(bulk_s * 1000, 1),
+        "bulk_queries": bulk_queries,
+        "speedup": round(orm_s / bulk_s, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.deletes", description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Database to run against (default: temporary SQLite); its tables are recreated")
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.database_url, args.items, args.rounds)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
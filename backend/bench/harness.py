@@ -0,0 +1,184 @@
+import asyncio
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+class ScenarioFailed(Exception):
+    """A scenario saw wrong behaviour, not merely slow behaviour."""
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    elapsed: float = 0.0
+    errors: int = 0
+    latencies: list[float] = field(default_factory=list)
+    extra: dict = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        ops = len(self.latencies)
+        return {
+            "ops": ops,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed, 4),
+            "throughput_rps": round(ops / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(self.latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 3),
+            **self.extra,
+        }
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, concurrency: int, requests: int):
+        self.client = client
+        self.concurrency = concurrency
+        self.requests = requests
+
+    async def run(
+        self,
+        result: ScenarioResult,
+        op: Callable[[int], Awaitable[httpx.Response]],
+        total: int | None = None,
+        ok_statuses: tuple[int, ...] = (200,),
+        concurrency: int | None = None,
+    ) -> ScenarioResult:
+        total = self.requests if total is None else total
+        next_index = 0
+
+        async def worker():
+            nonlocal next_index
+            while next_index < total:
+                i = next_index
+                next_index += 1
+                started = time.perf_counter()
+                try:
+                    resp = await op(i)
+                    ok = resp.status_code in ok_statuses
+                except httpx.HTTPError:
+                    ok = False
+                result.latencies.append(time.perf_counter() - started)
+                if not ok:
+                    result.errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency or self.concurrency)))
+        result.elapsed += time.perf_counter() - started
+        return result
+
+    async def owner(self, lists: int = 1, items: int = 0, price: int = 100) -> tuple[dict, list[dict]]:
+        email = f"bench-{uuid4().hex[:12]}@example.com"
+        r = await self.client.post("/api/auth/register", json={"email": email, "password": "bench-secret"})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        created = []
+        for n in range(lists):
+            r = await self.client.post("/api/wishlists", json={"name": f"Bench {n}", "occasion": "Bench"}, headers=headers)
+            r.raise_for_status()
+            wishlist = {**r.json(), "item_ids": []}
+            for i in range(items):
+                r = await self.client.post(
+                    f"/api/wishlists/{wishlist['id']}/items",
+                    json={"name": f"Item {i}", "url": "https://example.com", "price": price},
+                    headers=headers,
+                )
+                r.raise_for_status()
+                wishlist["item_ids"].append(r.json()["id"])
+            created.append(wishlist)
+        return headers, created
+
+
+@asynccontextmanager
+async def open_client(base_url: str | None, database_url: str | None):
+    """Yield an HTTP client against a live server, or against the app in-process."""
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+            yield client
+        return
+
+    tmpdir = None
+    if not database_url:
+        tmpdir = tempfile.mkdtemp(prefix="wishlist-bench-")
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    # The engine is built from settings at import time, so configure it first.
+    os.environ["DATABASE_URL"] = database_url
+    # Every scenario comes from one client address; throttling would measure the limiter.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    from app import models  # noqa: F401
+    from app.core.database import Base, engine
+    from app.main import app
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+                yield client
+    finally:
+        await engine.dispose()
+        if tmpdir:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+
+def environment(target: str, database_url: str | None, concurrency: int, requests: int) -> dict:
+    return {
+        "target": target,
+        "database": (database_url or "sqlite (temporary)").split("@")[-1],
+        "concurrency": concurrency,
+        "requests": requests,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """Return one message per scenario metric that regressed beyond ``tolerance``."""
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if before[metric] and now[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {now[metric]}")
+        if before["throughput_rps"] and now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput_rps {before['throughput_rps']} -> {now['throughput_rps']}")
+        if now["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {now['errors']}")
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def dump(report: dict, path: str | None) -> None:
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,104 @@
+import random
+from uuid import uuid4
+
+from bench.harness import Bench, ScenarioFailed, ScenarioResult
+
+
+async def public_read_storm(bench: Bench) -> ScenarioResult:
+    """Many anonymous viewers loading the same public page."""
+    _, (wishlist,) = await bench.owner(lists=1, items=20)
+    slug = wishlist["slug"]
+    result = ScenarioResult("public_read_storm")
+    return await bench.run(
+        result,
+        lambda i: bench.client.get(f"/api/wishlists/public/{slug}", params={"anonymous_token": f"viewer-{i}"}),
+    )
+
+
+async def reserve_race(bench: Bench) -> ScenarioResult:
+    """Every worker tries to reserve the same item; exactly one may win per item."""
+    rounds = max(1, bench.requests // bench.concurrency)
+    _, (wishlist,) = await bench.owner(lists=1, items=rounds)
+    slug = wishlist["slug"]
+    result = ScenarioResult("reserve_race")
+    winners = 0
+    for item_id in wishlist["item_ids"]:
+
+        async def reserve(i: int, item_id: str = item_id):
+            nonlocal winners
+            resp = await bench.client.post(
+                f"/api/wishlists/public/{slug}/items/{item_id}/reserve",
+                json={"anonymous_token": f"racer-{uuid4().hex}"},
+            )
+            winners += resp.status_code == 200
+            return resp
+
+        await bench.run(result, reserve, total=bench.concurrency, ok_statuses=(200, 404))
+    result.extra["winners"] = winners
+    result.extra["items"] = rounds
+    if winners != rounds:
+        raise ScenarioFailed(f"reserve_race: {winners} winning reservations for {rounds} items")
+    return result
+
+
+async def contribute_burst(bench: Bench) -> ScenarioResult:
+    """A burst of small contributions racing toward one item's target."""
+    _, (wishlist,) = await bench.owner(lists=1, items=1, price=bench.requests * 10)
+    slug, item_id = wishlist["slug"], wishlist["item_ids"][0]
+    result = ScenarioResult("contribute_burst")
+    return await bench.run(
+        result,
+        lambda i: bench.client.post(
+            f"/api/wishlists/public/{slug}/items/{item_id}/contribute",
+            json={"amount": 10, "anonymous_token": f"donor-{i}"},
+        ),
+    )
+
+
+async def dashboard(bench: Bench) -> ScenarioResult:
+    """An owner with many lists loading the dashboard and opening lists."""
+    headers, lists = await bench.owner(lists=30, items=3)
+    result = ScenarioResult("dashboard")
+
+    def load(i: int):
+        if i % 2 == 0:
+            return bench.client.get("/api/wishlists/my", headers=headers)
+        return bench.client.get(f"/api/wishlists/{lists[i % len(lists)]['id']}", headers=headers)
+
+    return await bench.run(result, load)
+
+
+async def mixed(bench: Bench) -> ScenarioResult:
+    """Mostly page views with a steady trickle of reservations and contributions."""
+    _, (wishlist,) = await bench.owner(lists=1, items=max(10, bench.requests // 20), price=bench.requests * 10)
+    slug, item_ids = wishlist["slug"], wishlist["item_ids"]
+    rng = random.Random(42)
+    result = ScenarioResult("mixed")
+
+    def op(i: int):
+        roll = rng.random()
+        if roll < 0.9:
+            return bench.client.get(f"/api/wishlists/public/{slug}", params={"anonymous_token": f"viewer-{i}"})
+        item_id = rng.choice(item_ids)
+        if roll < 0.95:
+            return bench.client.post(
+                f"/api/wishlists/public/{slug}/items/{item_id}/reserve",
+                json={"anonymous_token": f"guest-{i}"},
+            )
+        return bench.client.post(
+            f"/api/wishlists/public/{slug}/items/{item_id}/contribute",
+            json={"amount": 1, "anonymous_token": f"guest-{i}"},
+        )
+
+    # Reserving an already reserved item (404) or contributing to a
+    # reserved one (400) are expected outcomes under contention.
+    return await bench.run(result, op, ok_statuses=(200, 400, 404))
+
+
+SCENARIOS = {
+    "public_read_storm": public_read_storm,
+    "reserve_race": reserve_race,
+    "contribute_burst": contribute_burst,
+    "dashboard": dashboard,
+    "mixed": mixed,
+}
@@ -0,0 +1,107 @@
+"""Microbenchmark: serializing a 1,000-item public wishlist.
+
+Compares FastAPI's default path (validated models, response_model
+re-validation, JSONResponse) with model_construct() + FastJSONResponse.
+Run ``python -m bench.serialization``.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.wishlists import _public_item
+from app.core.responses import FastJSONResponse
+from app.schemas.wishlist import WishlistItemPublic, WishlistPublicResponse
+
+
+def fake_wishlist(n_items: int) -> SimpleNamespace:
+    items = []
+    for i in range(n_items):
+        contributions = [
+            SimpleNamespace(amount=Decimal("10.50"), contributor_key=f"guest-{j}") for j in range(i % 3)
+        ]
+        reservations = [SimpleNamespace(reserver_key="guest-0")] if i % 4 == 0 else []
+        items.append(SimpleNamespace(
+            id=uuid4(),
+            name=f"Item {i}",
+            url=f"https://shop.example.com/products/{i}",
+            price=Decimal("1299.99"),
+            image_url=f"https://cdn.example.com/{i}.jpg",
+            image_hash=None,
+            target_amount=Decimal("500.00") if i % 2 else None,
+            reservations=reservations,
+            contributions=contributions,
+        ))
+    return SimpleNamespace(id=uuid4(), name="Bench", occasion="Birthday", slug="benchslug001", items=items)
+
+
+def _validated_item(item, key: str) -> WishlistItemPublic:
+    trusted = _public_item(item, key, key)
+    return WishlistItemPublic(**trusted.__dict__)
+
+
+async def default_path(wishlist, field) -> bytes:
+    content = WishlistPublicResponse(
+        id=wishlist.id,
+        name=wishlist.name,
+        occasion=wishlist.occasion,
+        slug=wishlist.slug,
+        items=[_validated_item(i, "guest-0") for i in wishlist.items],
+    )
+    serialized = await serialize_response(field=field, response_content=content, is_coroutine=True)
+    return JSONResponse(serialized).body
+
+
+async def fast_path(wishlist, field) -> bytes:
+    content = WishlistPublicResponse.model_construct(
+        id=wishlist.id,
+        name=wishlist.name,
+        occasion=wishlist.occasion,
+        slug=wishlist.slug,
+        items=[_public_item(i, "guest-0", "guest-0") for i in wishlist.items],
+    )
+    return FastJSONResponse(content).body
+
+
+async def measure(fn, wishlist, field, rounds: int) -> float:
+    await fn(wishlist, field)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await fn(wishlist, field)
+    return (time.perf_counter() - started) / rounds
+
+
+async def run(items: int, rounds: int) -> dict:
+    wishlist = fake_wishlist(items)
+    field = create_model_field(name="Response", type_=WishlistPublicResponse, mode="serialization")
+    assert json.loads(await default_path(wishlist, field)) == json.loads(await fast_path(wishlist, field))
+    default_s = await measure(default_path, wishlist, field, rounds)
+    fast_s = await measure(fast_path, wishlist, field, rounds)
+    return {
+        "items": items,
+        "default_ms": round(default_s * 1000, 3),
+        "fast_ms": round(fast_s * 1000, 3),
+        "speedup": round(default_s / fast_s, 2),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.serialization", description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run(args.items, args.rounds)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""WebSocket scale harness.
+
+Starts the app under uvicorn on a temporary SQLite database, opens
+thousands of ``/ws/wishlist/{slug}`` clients spread over many channels,
+triggers reservations and measures the time from the mutation until the
+last socket in the channel received the event, plus server RSS per
+connection. Run ``python -m bench.ws_scale --help``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from websockets.asyncio.client import connect
+
+from bench.harness import percentile
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_kb(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def _prepare_database(database_url: str) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    from app import models  # noqa: F401
+    from app.core.database import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+class Server:
+    def __init__(self, database_url: str):
+        self.port = _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.database_url = database_url
+        self.process: subprocess.Popen | None = None
+
+    async def __aenter__(self) -> "Server":
+        # Lift the connection caps: the harness deliberately overloads channels.
+        env = {**os.environ, "DATABASE_URL": self.database_url,
+               "WS_MAX_CONNECTIONS": "1000000", "WS_MAX_CONNECTIONS_PER_CHANNEL": "1000000",
+               "RATE_LIMIT_ENABLED": "false"}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(self.port), "--log-level", "warning",
+             "--ws-max-queue", "32", "--backlog", "8192"],
+            env=env,
+        )
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            for _ in range(200):
+                try:
+                    if (await client.get("/api/health")).status_code == 200:
+                        return self
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.05)
+        raise RuntimeError("server did not start")
+
+    async def __aexit__(self, *exc) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class Channel:
+    def __init__(self, slug: str, item_ids: list[str]):
+        self.slug = slug
+        self.item_ids = item_ids
+        self.sockets = 0
+        self.received = 0
+        self.last_receive = 0.0
+        self.done = asyncio.Event()
+
+    def expect(self) -> None:
+        self.received = 0
+        self.done.clear()
+
+    def on_event(self) -> None:
+        self.received += 1
+        self.last_receive = time.perf_counter()
+        if self.received >= self.sockets:
+            self.done.set()
+
+
+async def _listen(ws, channel: Channel) -> None:
+    async for raw in ws:
+        message = json.loads(raw)
+        if message.get("type") == "ping":
+            await ws.send('{"type": "pong"}')
+        elif message.get("type") == "reservation":
+            channel.on_event()
+
+
+async def _seed(client: httpx.AsyncClient, channels: int, items: int) -> list[Channel]:
+    r = await client.post("/api/auth/register", json={"email": "ws-scale@example.com", "password": "bench-secret"})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    created = []
+    for n in range(channels):
+        r = await client.post("/api/wishlists", json={"name": f"WS {n}", "occasion": "Bench"}, headers=headers)
+        r.raise_for_status()
+        wishlist = r.json()
+        item_ids = []
+        for i in range(items):
+            r = await client.post(
+                f"/api/wishlists/{wishlist['id']}/items",
+                json={"name": f"Item {i}", "url": "https://example.com", "price": 1},
+                headers=headers,
+            )
+            r.raise_for_status()
+            item_ids.append(r.json()["id"])
+        created.append(Channel(wishlist["slug"], item_ids))
+    return created
+
+
+async def _open(server: Server, channel: Channel, sockets: list, listeners: list, semaphore: asyncio.Semaphore) -> None:
+    url = server.base_url.replace("http", "ws") + f"/ws/wishlist/{channel.slug}"
+    async with semaphore:
+        ws = await connect(url, open_timeout=60, ping_interval=None, max_queue=32)
+    channel.sockets += 1
+    sockets.append(ws)
+    listeners.append(asyncio.create_task(_listen(ws, channel)))
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    _raise_fd_limit()
+    steps = sorted(int(s) for s in args.steps.split(","))
+    tmpdir = tempfile.mkdtemp(prefix="wishlist-ws-")
+    database_url = f"sqlite+aiosqlite:///{os.path.join(tmpdir, 'ws.db')}"
+    await _prepare_database(database_url)
+    rows = []
+    sockets: list = []
+    listeners: list = []
+    try:
+        async with Server(database_url) as server, httpx.AsyncClient(base_url=server.base_url, timeout=60) as client:
+            channels = await _seed(client, args.channels, args.trials * len(steps))
+            semaphore = asyncio.Semaphore(args.connect_concurrency)
+            rss_base = _rss_kb(server.process.pid)
+            for step in steps:
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    _open(server, channels[i % len(channels)], sockets, listeners, semaphore)
+                    for i in range(len(sockets), step)
+                ))
+                connect_s = time.perf_counter() - started
+                await asyncio.sleep(0.5)
+                rss = _rss_kb(server.process.pid)
+                fanout = []
+                for trial in range(args.trials):
+                    channel = channels[trial % len(channels)]
+                    item_id = channel.item_ids.pop()
+                    channel.expect()
+                    mutated = time.perf_counter()
+                    r = await client.post(
+                        f"/api/wishlists/public/{channel.slug}/items/{item_id}/reserve",
+                        json={"anonymous_token": f"ws-scale-{step}-{trial}"},
+                    )
+                    r.raise_for_status()
+                    await asyncio.wait_for(channel.done.wait(), timeout=args.timeout)
+                    fanout.append(channel.last_receive - mutated)
+                per_channel = step // len(channels)
+                rows.append({
+                    "connections": step,
+                    "channels": len(channels),
+                    "sockets_per_channel": per_channel,
+                    "connect_s": round(connect_s, 2),
+                    "rss_mb": round(rss / 1024, 1) if rss else None,
+                    "rss_per_conn_kb": round((rss - rss_base) / step, 1) if rss and rss_base else None,
+                    "fanout_p50_ms": round(percentile(fanout, 50) * 1000, 2),
+                    "fanout_max_ms": round(max(fanout) * 1000, 2),
+                })
+                print(format_table(rows[-1:], header=not rows[:-1]), file=sys.stderr)
+    finally:
+        for task in listeners:
+            task.cancel()
+        await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+        for name in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir, name))
+        os.rmdir(tmpdir)
+    return rows
+
+
+COLUMNS = ("connections", "channels", "sockets_per_channel", "connect_s", "rss_mb", "rss_per_conn_kb", "fanout_p50_ms", "fanout_max_ms")
+
+
+def format_table(rows: list[dict], header: bool = True) -> str:
+    lines = []
+    if header:
+        lines.append("| " + " | ".join(COLUMNS) + " |")
+        lines.append("|" + "|".join("---:" for _ in COLUMNS) + "|")
+    for row in rows:
+        lines.append("| " + " | ".join("n/a" if row[c] is None else str(row[c]) for c in COLUMNS) + " |")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.ws_scale", description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", default="500,1000,2000,5000", help="Comma-separated total connection counts")
+    parser.add_argument("--channels", type=int, default=10, help="Wishlists the sockets are spread over")
+    parser.add_argument("--trials", type=int, default=5, help="Reservations timed per step")
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a broadcast to land")
+    parser.add_argument("--json", help="Also write the rows as JSON to this file")
+    args = parser.parse_args(argv)
+    rows = asyncio.run(run(args))
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,27 @@
 import os
 import asyncio
+import functools
+import json
+import time
+from contextlib import contextmanager
 from typing import AsyncGenerator
+from uuid import uuid4
 
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app.core.database import Base, get_db
+# Tests hammer the same routes from one address; rate limit tests opt back in.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from app.core import looplag
+from app.core.database import Base, count_queries, enforce_foreign_keys, get_db, get_read_db
 from app.models.user import User
 from app.models.wishlist import Wishlist, WishlistItem, Reservation, Contribution
+from app.websocket.manager import manager
 
 TEST_DB_PATH = os.path.join(os.path.dirname(__file__), "test.db")
 TEST_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DB_PATH}"
@@ -21,6 +31,7 @@ test_engine = create_async_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+enforce_foreign_keys(test_engine)
 
 TestingSessionLocal = sessionmaker(
     test_engine,
@@ -29,6 +40,47 @@ TestingSessionLocal = sessionmaker(
 )
 
 
+class FakeSocket:
+    """Stands in for a WebSocket (or SSE subscriber) in the connection manager.
+
+    Records whether it was accepted, every payload sent and how it was closed.
+    With ``fail=True`` sends raise, like a peer that has gone away.
+    """
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.accepted = False
+        self.sent: list[str] = []
+        self.close_code: int | None = None
+        self.close_reason: str | None = None
+        self.closed_at: float | None = None
+
+    @property
+    def events(self) -> list[dict]:
+        return [json.loads(payload) for payload in self.sent]
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, payload: str):
+        if self.fail:
+            raise RuntimeError("gone")
+        self.sent.append(payload)
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        self.close_code, self.close_reason, self.closed_at = code, reason, time.monotonic()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--max-loop-block",
+        type=float,
+        default=None,
+        metavar="MS",
+        help="Fail any async test that stalls the event loop for longer than MS milliseconds",
+    )
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     policy = asyncio.get_event_loop_policy()
@@ -56,6 +108,18 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+@pytest_asyncio.fixture
+async def sessions():
+    """Session factory with a connection per session, for code that runs sessions concurrently.
+
+    On the shared StaticPool connection one session's reset-on-return would roll
+    back another's pending writes.
+    """
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool, connect_args={"timeout": 30})
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
 @pytest_asyncio.fixture
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_db():
@@ -68,7 +132,91 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
 
     from app.main import app
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
         yield ac
     app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def owner_headers(client: AsyncClient) -> dict[str, str]:
+    """Auth headers for a freshly registered user."""
+    r = await client.post("/api/auth/register", json={"email": f"owner-{uuid4().hex[:12]}@example.com", "password": "secret123"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture
+def wishlist_with_item(client: AsyncClient, owner_headers: dict[str, str]):
+    """Create a wishlist for ``owner_headers`` with one item per field dict (one default item if none).
+
+    Returns the wishlist JSON and the item ids.
+    """
+
+    async def create(*items: dict) -> tuple[dict, list[str]]:
+        r = await client.post("/api/wishlists", json={"name": "Test", "occasion": "Test"}, headers=owner_headers)
+        wishlist = r.json()
+        ids = []
+        for fields in items or ({},):
+            r = await client.post(
+                f"/api/wishlists/{wishlist['id']}/items",
+                json={"name": "Gift", "url": "https://example.com", "price": 100, **fields},
+                headers=owner_headers,
+            )
+            assert r.status_code == 200, r.text
+            ids.append(r.json()["id"])
+        return wishlist, ids
+
+    return create
+
+
+@pytest.fixture
+def listen():
+    """Subscribe a FakeSocket to a wishlist's channel on the global manager."""
+    sockets = []
+
+    def _listen(slug: str) -> FakeSocket:
+        socket = FakeSocket()
+        manager.register(socket)
+        manager.subscribe(socket, f"wishlist:{slug}")
+        sockets.append(socket)
+        return socket
+
+    yield _listen
+    for socket in sockets:
+        manager.disconnect(socket)
+
+
+@pytest.fixture
+def max_queries():
+    """Fail the test when the wrapped block executes more SQL statements than allowed."""
+
+    @contextmanager
+    def _budget(limit: int):
+        with count_queries() as counter:
+            yield counter
+        assert counter.count <= limit, f"{counter.count} SQL statements executed, budget is {limit}"
+
+    return _budget
+
+
+@pytest.fixture
+def max_loop_block():
+    """Fail the test when the wrapped block stalls the event loop for longer than the limit (ms)."""
+    return looplag.max_loop_block
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    # Wrap only the test body: fixture setup runs while the loop is stopped.
+    limit = item.config.getoption("--max-loop-block")
+    if limit is not None and asyncio.iscoroutinefunction(item.obj) and not item.get_closest_marker("allow_loop_block"):
+        test = item.obj
+
+        @functools.wraps(test)
+        async def guarded(*args, **kwargs):
+            async with looplag.max_loop_block(limit):
+                return await test(*args, **kwargs)
+
+        item.obj = guarded
+    yield
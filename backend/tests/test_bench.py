@@ -0,0 +1,35 @@
+"""Benchmark harness helper tests."""
+
+from bench import serialization
+from bench.harness import Bench, compare, percentile
+from bench.scenarios import reserve_race
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    summary = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "throughput_rps": 100.0, "errors": 0}
+    baseline = {"scenarios": {"public_read_storm": summary}}
+    same = {"scenarios": {"public_read_storm": dict(summary, p95_ms=21.0)}}
+    worse = {"scenarios": {"public_read_storm": dict(summary, p95_ms=40.0, throughput_rps=50.0)}}
+    assert compare(baseline, same, tolerance=0.2) == []
+    regressions = compare(baseline, worse, tolerance=0.2)
+    assert any("p95_ms" in r for r in regressions)
+    assert any("throughput_rps" in r for r in regressions)
+
+
+async def test_serialization_bench_runs():
+    result = await serialization.run(items=20, rounds=1)
+    assert result["items"] == 20 and result["fast_ms"] > 0
+
+
+async def test_reserve_race_checks_one_winner_per_item(client):
+    # The test client shares one session, so the race itself runs one request at a time.
+    result = await reserve_race(Bench(client, concurrency=1, requests=3))
+    assert result.extra == {"winners": 3, "items": 3}
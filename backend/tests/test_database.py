@@ -0,0 +1,55 @@
+"""Engine profile detection and pool option tests."""
+
+import pytest
+from sqlalchemy.pool import NullPool
+
+from app.core import database
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("sqlite+aiosqlite:///./wishlist.db", "sqlite"),
+        ("postgresql+asyncpg://u:p@localhost:5432/wishlist", "direct"),
+        ("postgresql+asyncpg://u:p@ep-cool-1234-pooler.eu-central-1.aws.neon.tech/db?sslmode=require", "transaction-pooler"),
+        ("postgresql+asyncpg://u:p@db.internal:6432/wishlist", "transaction-pooler"),
+        ("postgresql+asyncpg://u:p@db.internal/wishlist?pgbouncer=true", "transaction-pooler"),
+    ],
+)
+def test_detect_profile(url, expected):
+    assert database.detect_profile(url) == expected
+
+
+def test_direct_profile_keeps_statement_cache_and_tunes_pool():
+    url, options = database.engine_options("postgresql+asyncpg://u:p@localhost/wishlist")
+    assert "statement_cache_size" not in options["connect_args"]
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == database.settings.db_pool_size
+    assert options["pool_recycle"] == database.settings.db_pool_recycle
+
+
+def test_transaction_pooler_profile_disables_statement_cache(monkeypatch):
+    url, options = database.engine_options("postgresql+asyncpg://u:p@db:6432/wishlist?pgbouncer=true&sslmode=require")
+    assert "pgbouncer" not in url and "sslmode" not in url
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert "ssl" in options["connect_args"]
+    assert "poolclass" not in options
+
+    monkeypatch.setattr(database.settings, "db_pooler_null_pool", True)
+    _, options = database.engine_options("postgresql+asyncpg://u:p@db:6432/wishlist")
+    assert options["poolclass"] is NullPool
+    assert "pool_size" not in options
+
+
+def test_explicit_profile_overrides_detection():
+    _, options = database.engine_options("postgresql+asyncpg://u:p@localhost/wishlist", "transaction-pooler")
+    assert options["connect_args"]["statement_cache_size"] == 0
+    with pytest.raises(ValueError):
+        database.engine_options("postgresql+asyncpg://u:p@localhost/wishlist", "bogus")
+
+
+def test_sqlite_profile_keeps_url_intact():
+    url, options = database.engine_options("sqlite+aiosqlite:///./wishlist.db")
+    assert url == "sqlite+aiosqlite:///./wishlist.db"
+    assert options == {}
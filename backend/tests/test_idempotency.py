@@ -0,0 +1,89 @@
+"""Idempotency-Key replay tests for reserve and contribute."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.core import idempotency
+from app.models.idempotency import IdempotencyKey
+from app.models.wishlist import Contribution
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+async def fundable_item(wishlist_with_item) -> tuple[str, str]:
+    wishlist, (item_id,) = await wishlist_with_item({"target_amount": 100})
+    return wishlist["slug"], item_id
+
+
+async def test_contribute_retry_is_replayed_not_recharged(client, db_session, max_queries, fundable_item):
+    slug, item_id = fundable_item
+    url = f"/api/wishlists/public/{slug}/items/{item_id}/contribute"
+    body = {"amount": 30, "anonymous_token": "retrier"}
+    headers = {"Idempotency-Key": "pay-1"}
+
+    first = await client.post(url, json=body, headers=headers)
+    with max_queries(2):
+        retry = await client.post(url, json=body, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert Decimal(retry.json()["total_contributed"]) == 30
+
+    total = await db_session.scalar(select(func.sum(Contribution.amount)).where(Contribution.contributor_key == "retrier"))
+    assert total == 30
+
+    other = await client.post(url, json=body, headers={"Idempotency-Key": "pay-2"})
+    assert Decimal(other.json()["total_contributed"]) == 60
+
+    mismatch = await client.post(url, json={**body, "amount": 5}, headers=headers)
+    assert mismatch.status_code == 422
+
+
+async def test_reserve_replay_and_failed_attempts_are_not_stored(client, fundable_item):
+    slug, item_id = fundable_item
+    url = f"/api/wishlists/public/{slug}/items/{item_id}/reserve"
+
+    missing = await client.post(f"/api/wishlists/public/{slug}/items/00000000-0000-0000-0000-000000000000/reserve",
+                                json={"anonymous_token": "a"}, headers={"Idempotency-Key": "r-0"})
+    assert missing.status_code == 404
+
+    first = await client.post(url, json={"anonymous_token": "a"}, headers={"Idempotency-Key": "r-1"})
+    retry = await client.post(url, json={"anonymous_token": "a"}, headers={"Idempotency-Key": "r-1"})
+    assert first.status_code == retry.status_code == 200
+    assert "idempotent-replayed" in retry.headers
+    # Without a key the duplicate still hits the uniqueness check.
+    assert (await client.post(url, json={"anonymous_token": "a"})).status_code == 404
+    # The same key from another caller is a different request.
+    assert (await client.post(url, json={"anonymous_token": "b"}, headers={"Idempotency-Key": "r-1"})).status_code == 404
+
+
+async def test_expired_key_is_a_first_use_again(client, db_session, fundable_item):
+    slug, item_id = fundable_item
+    url = f"/api/wishlists/public/{slug}/items/{item_id}/contribute"
+    headers = {"Idempotency-Key": "pay-expired"}
+    first = await client.post(url, json={"amount": 10, "anonymous_token": "late"}, headers=headers)
+    assert Decimal(first.json()["total_contributed"]) == 10
+
+    await db_session.execute(update(IdempotencyKey).values(expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    await db_session.commit()
+    # Past its TTL the key is not replayed, even with a different body.
+    again = await client.post(url, json={"amount": 5, "anonymous_token": "late"}, headers=headers)
+    assert again.status_code == 200 and "idempotent-replayed" not in again.headers
+    assert Decimal(again.json()["total_contributed"]) == 15
+    retry = await client.post(url, json={"amount": 5, "anonymous_token": "late"}, headers=headers)
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert Decimal(retry.json()["total_contributed"]) == 15
+
+
+async def test_sweeper_removes_expired_keys(db_session):
+    db_session.add(IdempotencyKey(key="e" * 64, fingerprint="f" * 64, status_code=200, body=b"{}",
+                                  expires_at=datetime.utcnow() - timedelta(seconds=1)))
+    db_session.add(IdempotencyKey(key="l" * 64, fingerprint="f" * 64, status_code=200, body=b"{}",
+                                  expires_at=datetime.utcnow() + timedelta(hours=1)))
+    await db_session.commit()
+    assert await idempotency.sweep(TestingSessionLocal) >= 1
+    keys = set((await db_session.execute(select(IdempotencyKey.key))).scalars())
+    assert "e" * 64 not in keys and "l" * 64 in keys
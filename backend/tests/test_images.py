@@ -0,0 +1,144 @@
+"""Thumbnail pipeline and /api/img endpoint tests."""
+
+import asyncio
+import io
+import os
+import shutil
+from uuid import UUID
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.wishlist import WishlistItem
+from app.services import images
+from app.services.price_refresh import PriceRefresher
+from tests.conftest import TestingSessionLocal
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png(width: int = 1200, height: int = 800) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 40)).save(out, "PNG")
+    return out.getvalue()
+
+
+async def _set_image_url(item_id: str, url: str) -> None:
+    # Set directly: through the API the item would be ingested by a background task.
+    async with TestingSessionLocal() as db:
+        row = (await db.execute(select(WishlistItem).where(WishlistItem.id == UUID(item_id)))).scalar_one()
+        row.image_url = url
+        await db.commit()
+
+
+@pytest.fixture(autouse=True)
+def image_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_cache_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "image_sizes", "160,320")
+
+
+async def test_ingest_caches_thumbnails_and_sets_hash(client, wishlist_with_item):
+    wishlist, (item_id,) = await wishlist_with_item({"name": "Lamp", "url": "https://lamps.test/lamp", "price": 10})
+    source = _png()
+    calls = []
+
+    def cdn(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, headers={"content-type": "image/png"}, content=source)
+
+    url = "https://cdn.test/lamp.png"
+    await _set_image_url(item_id, url)
+    digest = await images.ingest_item(UUID(item_id), url, TestingSessionLocal, httpx.MockTransport(cdn))
+    assert digest and len(calls) == 1
+
+    r = await client.get(f"/api/wishlists/public/{wishlist['slug']}")
+    assert r.json()["items"][0]["image_hash"] == digest
+
+    r = await client.get(f"/api/img/{digest}", params={"w": 200}, headers={"Accept": "image/webp,*/*"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/webp"
+    assert "immutable" in r.headers["cache-control"]
+    assert Image.open(io.BytesIO(r.content)).size == (320, 213)
+    assert len(r.content) < len(source)
+
+    r2 = await client.get(f"/api/img/{digest}", params={"w": 200}, headers={"Accept": "image/webp", "If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304
+
+    r = await client.get(f"/api/img/{digest}", params={"w": 100}, headers={"Accept": "image/*"})
+    assert r.headers["content-type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(r.content)).width == 160
+
+
+async def test_lost_cache_redirects_to_the_original_and_is_rebuilt(client, monkeypatch, wishlist_with_item):
+    _, (item_id,) = await wishlist_with_item({"name": "Vase", "url": "https://vases.test/vase", "price": 10})
+    url = "https://cdn.test/vase.png"
+    await _set_image_url(item_id, url)
+    cdn = httpx.MockTransport(lambda request: httpx.Response(200, headers={"content-type": "image/png"}, content=_png(300, 200)))
+    digest = await images.ingest_item(UUID(item_id), url, TestingSessionLocal, cdn)
+
+    # A redeploy wipes the disk, but the item keeps its image_hash.
+    shutil.rmtree(settings.image_cache_dir)
+    recovering = []
+
+    async def recover(*args):
+        recovering.append(args)
+
+    monkeypatch.setattr(images, "recover", recover)
+    r = await client.get(f"/api/img/{digest}", params={"w": 160}, follow_redirects=False)
+    assert r.status_code == 307 and r.headers["location"] == url
+    assert r.headers["cache-control"] == "no-store"
+    assert recovering == [(digest, UUID(item_id), url)]
+
+    monkeypatch.undo()
+    assert await images.recover(digest, UUID(item_id), url, TestingSessionLocal, cdn) == digest
+    assert images.cached(digest)
+
+
+async def test_price_refresh_backfills_uncached_images(sessions, wishlist_with_item):
+    _, (item_id,) = await wishlist_with_item({"name": "Old", "url": "https://old.test/item", "price": 10})
+    url = "https://cdn.test/old.png"
+    await _set_image_url(item_id, url)  # added before the cache existed: no image_hash
+
+    def web(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "cdn.test":
+            return httpx.Response(200, headers={"content-type": "image/png"}, content=_png(300, 200))
+        return httpx.Response(304)
+
+    await PriceRefresher(sessions, httpx.MockTransport(web)).refresh_once()
+    async with TestingSessionLocal() as db:
+        digest = (await db.execute(select(WishlistItem.image_hash).where(WishlistItem.id == UUID(item_id)))).scalar_one()
+    assert digest and images.cached(digest)
+
+
+async def test_ingest_rejects_non_images():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, headers={"content-type": "text/html"}, text="<html>"))
+    with pytest.raises(images.ImageFetchError):
+        await images.download("https://cdn.test/page", transport)
+
+
+async def test_unknown_or_malformed_hash_is_404(client):
+    assert (await client.get("/api/img/" + "0" * 64)).status_code == 404
+    assert (await client.get("/api/img/..%2F..%2Fetc")).status_code == 404
+
+
+async def test_concurrent_stores_of_the_same_image_both_succeed():
+    source = _png(400, 300)
+    digests = await asyncio.gather(*(asyncio.to_thread(images.store, source, "image/png") for _ in range(8)))
+    assert len(set(digests)) == 1
+    directory = os.path.join(settings.image_cache_dir, digests[0][:2], digests[0])
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_on_demand_render_applies_the_decode_limit(monkeypatch):
+    digest = images.store(_png(400, 300), "image/png")
+    os.remove(os.path.join(settings.image_cache_dir, digest[:2], digest, "160.jpeg"))
+    monkeypatch.setattr(settings, "image_max_pixels", 12_345)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", Image.MAX_IMAGE_PIXELS)
+    images._pil.cache_clear()
+    try:
+        with pytest.raises(Image.DecompressionBombError):
+            images.variant(digest, 100, "image/jpeg")
+    finally:
+        images._pil.cache_clear()
@@ -0,0 +1,35 @@
+"""Cold-start import budget tests."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "3000"))
+LAZY_MODULES = ("bs4", "httpx", "authlib", "passlib", "PIL")
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True, timeout=120
+    )
+
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    code = f"import sys, app.main; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    loaded = _python("-c", code).stdout.strip()
+    assert loaded == "", f"imported at startup: {loaded}"
+
+
+def test_app_import_time_within_budget():
+    stderr = _python("-X", "importtime", "-c", "import app.main").stderr
+    cumulative_us = None
+    for line in stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == "app.main":
+            cumulative_us = int(parts[1])
+    assert cumulative_us is not None, "no importtime entry for app.main"
+    assert cumulative_us / 1000 <= IMPORT_BUDGET_MS, (
+        f"import app.main took {cumulative_us / 1000:.0f} ms, budget is {IMPORT_BUDGET_MS:.0f} ms"
+    )
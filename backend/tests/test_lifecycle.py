@@ -0,0 +1,63 @@
+"""Startup warm-up, readiness and shutdown drain tests."""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core import lifecycle, metrics
+from app.core.database import Base, instrument_engine
+
+
+async def test_warm_up_opens_and_primes_connections(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp_path, 'warm.db')}", poolclass=AsyncAdaptedQueuePool, pool_size=3)
+    instrument_engine(engine, "warmup-test")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    before = metrics.db_pool_checkout_wait.count(engine="warmup-test")
+
+    warmed = await lifecycle.warm_up(engine, 2)
+
+    assert warmed == 2
+    assert metrics.db_pool_checkout_wait.count(engine="warmup-test") - before == 2
+    assert engine.sync_engine.pool.checkedin() >= 2
+    assert metrics.db_pool_in_use.value(engine="warmup-test") == 0
+    await engine.dispose()
+
+
+async def test_ready_endpoint_reflects_state(client, monkeypatch):
+    monkeypatch.setattr(lifecycle.state, "ready", False)
+    r = await client.get("/api/ready")
+    assert r.status_code == 503
+    monkeypatch.setattr(lifecycle.state, "ready", True)
+    r = await client.get("/api/ready")
+    assert r.status_code == 200
+
+
+@pytest.fixture
+def shutdown_state(monkeypatch):
+    # shutdown() flips the global flags; restore them for later tests.
+    monkeypatch.setattr(lifecycle.state, "ready", True)
+    monkeypatch.setattr(lifecycle.state, "draining", False)
+
+
+async def test_shutdown_waits_for_in_flight_requests(monkeypatch, shutdown_state):
+    monkeypatch.setattr(lifecycle.state, "in_flight", 1)
+
+    async def finish():
+        await asyncio.sleep(0.1)
+        lifecycle.state.in_flight -= 1
+
+    task = asyncio.create_task(finish())
+    await lifecycle.shutdown([])
+    assert task.done()
+    assert lifecycle.state.draining and not lifecycle.state.ready
+
+
+async def test_shutdown_gives_up_after_drain_timeout(monkeypatch, shutdown_state):
+    monkeypatch.setattr(lifecycle.state, "in_flight", 1)
+    monkeypatch.setattr(lifecycle.settings, "shutdown_drain_timeout", 0.1)
+    await lifecycle.shutdown([])
+    assert lifecycle.state.in_flight == 1
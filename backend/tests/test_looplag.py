@@ -0,0 +1,58 @@
+"""Event loop lag sampling, stall stacks and the blocking-call test guard."""
+
+import asyncio
+import gc
+import time
+
+import pytest
+
+from app.core import metrics
+from app.core.looplag import LoopLagMonitor
+
+
+def _block_for(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.allow_loop_block
+async def test_watchdog_logs_the_blocking_stack(caplog):
+    before = metrics.event_loop_blocked.value()
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.03)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.02)
+    _block_for(0.15)
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert monitor.max_lag >= 0.1
+    assert monitor.blocked and "_block_for" in monitor.blocked[0]["stack"]
+    assert metrics.event_loop_blocked.value() > before
+    assert any("Event loop blocked" in r.message for r in caplog.records)
+
+
+@pytest.mark.allow_loop_block
+async def test_max_loop_block_fails_on_a_stall(max_loop_block):
+    with pytest.raises(AssertionError, match="_block_for"):
+        async with max_loop_block(30):
+            _block_for(0.12)
+
+
+async def test_max_loop_block_allows_awaiting(max_loop_block):
+    async with max_loop_block(30):
+        await asyncio.sleep(0.1)
+
+
+async def test_password_hashing_does_not_block_the_loop(client, max_loop_block):
+    async with max_loop_block(100):
+        r = await client.post("/api/auth/register", json={"email": "nonblocking@example.com", "password": "secret123"})
+        assert r.status_code == 200
+        r = await client.post("/api/auth/login", json={"email": "nonblocking@example.com", "password": "secret123"})
+        assert r.status_code == 200
+
+
+async def test_max_loop_block_pauses_garbage_collection(max_loop_block):
+    was_enabled = gc.isenabled()
+    async with max_loop_block(100):
+        assert not gc.isenabled()
+    assert gc.isenabled() == was_enabled
@@ -0,0 +1,73 @@
+"""Metrics registry and /metrics endpoint tests."""
+
+import httpx
+
+from app.core.metrics import Counter, Gauge, Histogram, Registry, registry, websocket_channels, websocket_connections
+from app.main import app
+from app.websocket.manager import ConnectionManager
+from tests.conftest import FakeSocket
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    h = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    h.observe(0.05, route="/a")
+    h.observe(0.5, route="/a")
+    h.observe(5, route="/a")
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_and_gauge_render():
+    registry = Registry()
+    c = registry.register(Counter("hits_total", "Hits", ("status",)))
+    g = registry.register(Gauge("in_use", "In use"))
+    c.inc(status="200")
+    c.inc(2, status="200")
+    g.inc()
+    g.dec()
+    text = registry.render()
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{status="200"} 3' in text
+    assert "in_use 0" in text
+
+
+async def test_metrics_endpoint_reports_routes_and_queries(client):
+    await client.get("/api/health")
+    await client.get("/api/wishlists/public/no-such-slug")
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'http_responses_total{method="GET",route="/api/health",status="200"}' in body
+    assert 'http_responses_total{method="GET",route="/api/wishlists/public/{slug}",status="404"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/health",le="+Inf"}' in body
+    assert 'db_queries_total{statement="SELECT"}' in body
+
+
+async def test_metrics_require_a_token_or_loopback(client, monkeypatch):
+    remote = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=("203.0.113.7", 4000)), base_url="http://testserver")
+    async with remote:
+        assert (await remote.get("/metrics")).status_code == 403
+        assert (await client.get("/metrics", headers={"X-Forwarded-For": "127.0.0.1"})).status_code == 403
+        monkeypatch.setattr("app.main.settings.metrics_token", "scrape-me")
+        assert (await remote.get("/metrics")).status_code == 401
+        assert (await remote.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+        assert (await remote.get("/metrics", headers={"Authorization": "Bearer scrape-me"})).status_code == 200
+    assert (await client.get("/metrics")).status_code == 401
+
+
+async def test_websocket_gauges_do_not_expose_channels():
+    manager = ConnectionManager()
+    ok, dead = FakeSocket(), FakeSocket(fail=True)
+    await manager.connect(ok, "wishlist:secret-slug")
+    await manager.connect(dead, "wishlist:secret-slug")
+    assert websocket_connections.value() == 2 and websocket_channels.value() == 1
+    await manager.broadcast("wishlist:secret-slug", {"type": "ping"})
+    assert websocket_connections.value() == 1
+    manager.disconnect(ok)
+    assert websocket_connections.value() == 0 and websocket_channels.value() == 0
+    assert "secret-slug" not in registry.render()
@@ -0,0 +1,48 @@
+"""Broadcasts are dispatched only after the mutation commits."""
+
+from sqlalchemy import select
+
+from app.models.wishlist import Wishlist
+from app.websocket import outbox
+
+
+async def _setup(client, email: str):
+    r = await client.post("/api/auth/register", json={"email": email, "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    wishlist = (await client.post("/api/wishlists", json={"name": "Outbox", "occasion": "Test"}, headers=headers)).json()
+    return headers, wishlist
+
+
+async def test_public_and_owner_mutations_broadcast_after_commit(client, listen):
+    headers, wishlist = await _setup(client, "outbox@example.com")
+    socket = listen(wishlist["slug"])
+    base = f"/api/wishlists/{wishlist['id']}"
+    public = f"/api/wishlists/public/{wishlist['slug']}"
+
+    item = (await client.post(f"{base}/items", json={"name": "A", "url": "https://a.example", "price": 10}, headers=headers)).json()
+    await client.patch(f"{base}/items/{item['id']}", json={"name": "B"}, headers=headers)
+    await client.post(f"{public}/items/{item['id']}/reserve", json={"anonymous_token": "t"})
+    await client.request("DELETE", f"{public}/items/{item['id']}/reserve", json={"anonymous_token": "t"})
+    r = await client.post(f"{public}/items/{item['id']}/contribute", json={"amount": 4, "anonymous_token": "t"})
+    assert r.json()["contributed_by_me"] == "4"
+    other = (await client.post(f"{base}/items", json={"name": "C", "url": "https://c.example", "price": 1}, headers=headers)).json()
+    await client.delete(f"{base}/items/{other['id']}", headers=headers)
+    await client.delete(base, headers=headers)
+    await outbox.flush()
+
+    assert [m["type"] for m in socket.events] == [
+        "item_added", "item_updated", "reservation", "unreserve", "contribution",
+        "item_added", "item_deleted", "wishlist_deleted",
+    ]
+    assert [m["seq"] for m in socket.events] == list(range(1, 9))
+
+
+async def test_rolled_back_mutation_is_not_broadcast(client, db_session, listen):
+    _, wishlist = await _setup(client, "rollback@example.com")
+    socket = listen(wishlist["slug"])
+    await db_session.execute(select(Wishlist.id).limit(1))
+    outbox.publish(db_session, f"wishlist:{wishlist['slug']}", {"type": "item_added"})
+    await db_session.rollback()
+    await db_session.commit()
+    await outbox.flush()
+    assert socket.events == []
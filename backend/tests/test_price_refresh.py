@@ -0,0 +1,105 @@
+"""Background price re-scraping tests against an httpx.MockTransport stand-in."""
+
+import asyncio
+from decimal import Decimal
+from uuid import UUID
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.wishlist import PriceObservation, WishlistItem
+from app.services.price_refresh import PriceRefresher
+from tests.conftest import TestingSessionLocal
+
+PAGE = '<html><head><meta property="product:price:amount" content="{price}"></head></html>'
+
+
+class _Shop:
+    def __init__(self):
+        self.price = "100"
+        self.etag = '"v1"'
+        self.requests: list[httpx.Request] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.host != "shop.test":
+            return httpx.Response(404)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": self.etag}, html=PAGE.format(price=self.price))
+
+
+@pytest.fixture
+def refresh_settings(monkeypatch):
+    monkeypatch.setattr(settings, "price_refresh_max_age", 0.0)
+    monkeypatch.setattr(settings, "price_refresh_batch", 1000)
+    monkeypatch.setattr(settings, "price_refresh_per_host", 2)
+    monkeypatch.setattr(settings, "price_refresh_host_delay", 0.0)
+
+
+def _products(count: int = 1) -> list[dict]:
+    return [{"name": f"Thing {n}", "url": f"https://shop.test/p/{n}", "price": 100} for n in range(count)]
+
+
+async def _state(item_id: str):
+    item_id = UUID(item_id)
+    async with TestingSessionLocal() as db:
+        item = (await db.execute(select(WishlistItem).where(WishlistItem.id == item_id))).scalar_one()
+        history = (await db.execute(select(PriceObservation.price).where(PriceObservation.item_id == item.id))).scalars().all()
+        return item, list(history)
+
+
+async def test_refresh_uses_conditional_requests_and_records_history(wishlist_with_item, refresh_settings, sessions, listen):
+    wishlist, (item_id,) = await wishlist_with_item(*_products())
+    shop = _Shop()
+    refresher = PriceRefresher(sessions, httpx.MockTransport(shop))
+
+    await refresher.refresh_once()
+    item, history = await _state(item_id)
+    assert item.fetch_etag == '"v1"' and history == [Decimal("100")]
+
+    await refresher.refresh_once()
+    page_requests = [r for r in shop.requests if r.url.host == "shop.test"]
+    assert page_requests[-1].headers["if-none-match"] == '"v1"'
+    assert (await _state(item_id))[1] == [Decimal("100")]
+
+    socket = listen(wishlist["slug"])
+    shop.price, shop.etag = "79.90", '"v2"'
+    counts = await refresher.refresh_once()
+    item, history = await _state(item_id)
+    assert counts["changed"] == 1
+    assert item.price == Decimal("79.90") and item.fetch_etag == '"v2"'
+    assert sorted(history) == [Decimal("79.90"), Decimal("100")]
+    assert socket.events[0]["type"] == "item_updated"
+
+
+async def test_refresh_limits_concurrency_per_host(wishlist_with_item, refresh_settings, sessions):
+    await wishlist_with_item(*_products(6))
+    shop = _Shop()
+    await PriceRefresher(sessions, httpx.MockTransport(shop)).refresh_once()
+    assert len([r for r in shop.requests if r.url.host == "shop.test"]) >= 6
+    assert shop.max_in_flight == 2
+
+
+async def test_unfetchable_urls_do_not_starve_the_batch(wishlist_with_item, refresh_settings, sessions, monkeypatch):
+    shop = _Shop()
+    refresher = PriceRefresher(sessions, httpx.MockTransport(shop))
+    await refresher.refresh_once()  # everything already in the table has now been checked
+
+    await wishlist_with_item(*({"name": url, "url": url} for url in ("ftp://shop.test/a", "mailto:gift@example.com", "a shop downtown")))
+    _, (item_id,) = await wishlist_with_item(*_products())
+
+    monkeypatch.setattr(settings, "price_refresh_batch", 3)
+    due = await refresher._due()
+    assert due[0][0] == UUID(item_id)
+    assert all(row[1].startswith("https://") for row in due)
+    await refresher.refresh_once()
+    assert (await _state(item_id))[0].price_checked_at is not None
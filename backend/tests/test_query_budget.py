@@ -0,0 +1,61 @@
+"""SQL statement budgets per endpoint (N+1 guard)."""
+
+from app.core.database import QUERY_COUNT_HEADER
+
+
+async def _owner_with_items(client, email: str, n_items: int) -> tuple[dict, str, str]:
+    r_reg = await client.post("/api/auth/register", json={"email": email, "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r_reg.json()['access_token']}"}
+    r_wl = await client.post("/api/wishlists", json={"name": "Budget", "occasion": "Test"}, headers=headers)
+    wishlist_id, slug = r_wl.json()["id"], r_wl.json()["slug"]
+    for i in range(n_items):
+        r_item = await client.post(
+            f"/api/wishlists/{wishlist_id}/items",
+            json={"name": f"Gift {i}", "url": "https://example.com", "price": 100},
+            headers=headers,
+        )
+        if i % 2:
+            await client.post(
+                f"/api/wishlists/public/{slug}/items/{r_item.json()['id']}/reserve",
+                json={"anonymous_token": f"guest-{i}"},
+            )
+    return headers, wishlist_id, slug
+
+
+async def test_public_page_query_count_is_independent_of_item_count(client, max_queries):
+    _, _, small = await _owner_with_items(client, "budget-small@example.com", 1)
+    _, _, large = await _owner_with_items(client, "budget-large@example.com", 12)
+
+    with max_queries(4) as small_counter:
+        r = await client.get(f"/api/wishlists/public/{small}")
+    assert r.status_code == 200
+    with max_queries(4) as large_counter:
+        r = await client.get(f"/api/wishlists/public/{large}")
+    assert r.status_code == 200
+    assert len(r.json()["items"]) == 12
+    assert large_counter.count == small_counter.count
+
+
+async def test_owner_endpoints_stay_within_budget(client, max_queries):
+    headers, wishlist_id, _ = await _owner_with_items(client, "budget-owner@example.com", 8)
+    with max_queries(3):
+        r = await client.get("/api/wishlists/my", headers=headers)
+    assert r.status_code == 200
+    with max_queries(5):
+        r = await client.get(f"/api/wishlists/{wishlist_id}", headers=headers)
+    assert r.status_code == 200
+    with max_queries(6):
+        r = await client.post(
+            f"/api/wishlists/{wishlist_id}/items",
+            json={"name": "One more", "url": "https://example.com", "price": 1},
+            headers=headers,
+        )
+    assert r.status_code == 200
+
+
+async def test_query_count_header_only_in_debug(client, monkeypatch):
+    r = await client.get("/api/wishlists/public/nope")
+    assert QUERY_COUNT_HEADER not in r.headers
+    monkeypatch.setattr("app.core.database.settings.debug", True)
+    r = await client.get("/api/wishlists/public/nope")
+    assert r.headers[QUERY_COUNT_HEADER] == "1"
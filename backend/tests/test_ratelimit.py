@@ -0,0 +1,83 @@
+"""Token-bucket rate limiting tests."""
+
+import httpx
+import pytest
+from pydantic import ValidationError
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+from app import server
+from app.core import ratelimit
+from app.core.config import Settings, settings
+from app.core.ratelimit import DatabaseStore, MemoryStore, parse_limit
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_reserve", "2/minute")
+    monkeypatch.setattr(settings, "rate_limit_ip_factor", 2.0)
+    monkeypatch.setattr(ratelimit, "_store", MemoryStore())
+
+
+def test_parse_limit():
+    assert parse_limit("10/minute") == (10.0, 10 / 60)
+    assert parse_limit("3/30") == (3.0, 0.1)
+
+
+@pytest.mark.parametrize("spec", ["ten/minute", "10/fortnight", "0/minute", "5/0"])
+def test_bad_limits_fail_when_settings_load(spec):
+    with pytest.raises(ValidationError, match="rate_limit_contribute"):
+        Settings(rate_limit_contribute=spec)
+
+
+async def test_memory_bucket_refills():
+    store = MemoryStore()
+    assert await store.take("k", 2, 1000) == 0
+    assert await store.take("k", 2, 1000) == 0
+    assert await store.take("k", 1, 1 / 60) > 0
+
+
+async def test_reserve_returns_429_with_retry_after(client, limited):
+    url = "/api/wishlists/public/no-such-slug/items/00000000-0000-0000-0000-000000000000/reserve"
+    for _ in range(2):
+        assert (await client.post(url, json={"anonymous_token": "spam"})).status_code == 404
+    r = await client.post(url, json={"anonymous_token": "spam"})
+    assert r.status_code == 429
+    assert 1 <= int(r.headers["retry-after"]) <= 30
+
+    # A fresh token has its own bucket, but the shared IP bucket (2 x 2) still caps the address.
+    assert (await client.post(url, json={"anonymous_token": "other"})).status_code == 404
+    assert (await client.post(url, json={"anonymous_token": "third"})).status_code == 429
+
+
+async def test_ip_bucket_uses_forwarded_address_from_trusted_proxy(client, limited, monkeypatch):
+    from app.main import app
+
+    captured = []
+    monkeypatch.setattr(server.Server, "run", lambda self: captured.append(self.config))
+    monkeypatch.setattr(settings, "forwarded_allow_ips", "10.0.0.0/8")
+    server.main(["--port", "0"])
+    assert captured[0].forwarded_allow_ips == "10.0.0.0/8" and captured[0].proxy_headers
+
+    proxied = ProxyHeadersMiddleware(app, trusted_hosts="10.0.0.0/8")
+    transport = httpx.ASGITransport(app=proxied, client=("10.1.2.3", 443))
+    url = "/api/wishlists/public/no-such-slug/items/00000000-0000-0000-0000-000000000000/reserve"
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as proxy:
+
+        async def reserve(ip: str, token: str) -> int:
+            r = await proxy.post(url, json={"anonymous_token": token}, headers={"X-Forwarded-For": ip})
+            return r.status_code
+
+        # Four fresh tokens from one address exhaust its 2 x 2 IP bucket...
+        assert [await reserve("198.51.100.1", f"a{n}") for n in range(5)] == [404] * 4 + [429]
+        # ...without throttling a different client behind the same proxy.
+        assert await reserve("198.51.100.2", "b0") == 404
+
+
+async def test_database_store_shares_buckets(monkeypatch, db_session):
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(ratelimit, "async_session", TestingSessionLocal)
+    store = DatabaseStore()
+    assert await store.take("db-key", 1, 1 / 60) == 0
+    assert await store.take("db-key", 1, 1 / 60) > 0
@@ -0,0 +1,55 @@
+"""Read replica routing and primary stickiness tests."""
+
+from fastapi import Response
+from starlette.requests import Request
+
+from app.core import database
+
+
+def _request(query: str = "", cookie: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": query.encode(), "headers": headers})
+
+
+def _key(token: str) -> str:
+    return database.viewer_key(_request(f"anonymous_token={token}"))
+
+
+def test_no_replica_means_no_stickiness(monkeypatch):
+    monkeypatch.setattr(database, "read_engine", None)
+    response = Response()
+    database.stick_to_primary(response, _key("anon-1"))
+    assert "set-cookie" not in response.headers
+    assert not database.prefers_primary(_request("anonymous_token=anon-1"))
+
+
+def test_mutation_sticks_viewer_to_primary(monkeypatch):
+    monkeypatch.setattr(database, "read_engine", object())
+    monkeypatch.setattr(database, "_recent_writers", {})
+    response = Response()
+    database.stick_to_primary(response, _key("anon-1"))
+    assert database.PRIMARY_STICKY_COOKIE in response.headers["set-cookie"]
+    assert database.prefers_primary(_request("anonymous_token=anon-1"))
+    assert not database.prefers_primary(_request("anonymous_token=anon-2"))
+    assert database.prefers_primary(_request(cookie=f"{database.PRIMARY_STICKY_COOKIE}=1"))
+    assert "anon-1" not in database._recent_writers
+
+
+def test_bearer_tokens_are_not_kept_in_memory(monkeypatch):
+    monkeypatch.setattr(database, "read_engine", object())
+    monkeypatch.setattr(database, "_recent_writers", {})
+    request = Request({"type": "http", "method": "POST", "path": "/", "query_string": b"",
+                       "headers": [(b"authorization", b"Bearer live.jwt.token")]})
+    database.stick_to_primary(Response(), database.viewer_key(request))
+    assert database.prefers_primary(request)
+    assert not any("live.jwt.token" in key for key in database._recent_writers)
+
+
+def test_stickiness_expires(monkeypatch):
+    monkeypatch.setattr(database, "read_engine", object())
+    monkeypatch.setattr(database, "_recent_writers", {})
+    monkeypatch.setattr(database.settings, "read_primary_sticky_seconds", 5.0)
+    database.stick_to_primary(Response(), _key("anon-1"))
+    now = database.time.monotonic()
+    monkeypatch.setattr(database.time, "monotonic", lambda: now + 6)
+    assert not database.prefers_primary(_request("anonymous_token=anon-1"))
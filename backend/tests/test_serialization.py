@@ -0,0 +1,38 @@
+"""Fast response serialization tests."""
+
+from decimal import Decimal
+
+from app.core.responses import dumps
+from app.schemas.wishlist import WishlistPublicResponse
+
+
+async def test_public_wishlist_payload_matches_validated_model(client):
+    r_reg = await client.post("/api/auth/register", json={"email": "ser@example.com", "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r_reg.json()['access_token']}"}
+    r_wl = await client.post("/api/wishlists", json={"name": "Ser", "occasion": "Test"}, headers=headers)
+    wishlist_id, slug = r_wl.json()["id"], r_wl.json()["slug"]
+    r_item = await client.post(
+        f"/api/wishlists/{wishlist_id}/items",
+        json={"name": "Gift", "url": "https://example.com", "price": "80.50", "target_amount": 100},
+        headers=headers,
+    )
+    item_id = r_item.json()["id"]
+    await client.post(
+        f"/api/wishlists/public/{slug}/items/{item_id}/contribute",
+        json={"amount": "25.25", "anonymous_token": "donor"},
+    )
+
+    r = await client.get(f"/api/wishlists/public/{slug}", params={"anonymous_token": "donor"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    payload = r.json()
+    assert payload == WishlistPublicResponse.model_validate(payload).model_dump(mode="json")
+    item = payload["items"][0]
+    assert item["price"] == "80.50"
+    assert item["total_contributed"] == "25.25"
+    assert item["contributed_by_me"] == "25.25"
+    assert item["progress"] == 0.2525
+
+
+def test_dumps_formats_decimals_as_strings():
+    assert dumps({"a": Decimal("0"), "b": Decimal("1.50")}) == b'{"a":"0","b":"1.50"}'
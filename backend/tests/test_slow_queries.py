@@ -0,0 +1,81 @@
+"""Slow statements are recorded with redacted parameters and an out-of-band plan."""
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import redact_parameters, slow_query_log
+from app.models.wishlist import Wishlist
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def slow_everything(monkeypatch):
+    monkeypatch.setattr("app.core.database.settings.slow_query_log_enabled", True)
+    monkeypatch.setattr("app.core.database.settings.slow_query_threshold_ms", 0.0)
+
+
+def test_parameters_are_redacted():
+    assert redact_parameters(("secret@example.com", 42, None, True)) == ["<str len=18>", "<int>", None, True]
+    assert redact_parameters({"token": b"abc"}) == {"token": "<bytes len=3>"}
+    assert redact_parameters([("a",), ("b",)], executemany=True) == "<2 parameter sets>"
+
+
+async def test_slow_statement_gets_a_query_plan(slow_everything):
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    slow_query_log.watch(engine, "explain-test")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(select(Wishlist.id).where(Wishlist.slug == "very-private-slug"))
+        await slow_query_log.flush()
+    finally:
+        await engine.dispose()
+
+    (entry,) = [e for e in slow_query_log.entries if e["engine"] == "explain-test"]
+    assert entry["statement"].startswith("SELECT wishlists.id")
+    assert "very-private-slug" not in str(entry["parameters"])
+    assert entry["parameters"] == ["<str len=17>"]
+    assert any("wishlists" in line for line in entry["plan"])
+    assert not any(e["statement"].startswith("EXPLAIN") for e in slow_query_log.entries)
+
+
+async def test_repeated_slow_statement_is_explained_once(slow_everything):
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    slow_query_log.watch(engine, "explain-once")
+    explains = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_explains(conn, cursor, statement, *args):
+        if statement.startswith("EXPLAIN"):
+            explains.append(statement)
+
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.execute(select(Wishlist.id).where(Wishlist.name == "again"))
+            await slow_query_log.flush()
+    finally:
+        await engine.dispose()
+
+    entries = [e for e in slow_query_log.entries if e["engine"] == "explain-once"]
+    assert len(entries) == 3 and len(explains) == 1
+    assert entries[2]["plan"] == entries[0]["plan"]
+
+
+async def test_slow_query_endpoint_is_admin_only(client, monkeypatch):
+    async def token(email: str) -> dict:
+        r = await client.post("/api/auth/register", json={"email": email, "password": "secret123"})
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    admin, visitor = await token("dba@example.com"), await token("nosy@example.com")
+    admin_id = (await client.get("/api/auth/me", headers=admin)).json()["id"]
+    monkeypatch.setattr("app.core.auth.settings.admin_user_ids", f"{uuid4()}, {admin_id.upper()}")
+
+    assert (await client.get("/api/admin/slow-queries")).status_code == 401
+    assert (await client.get("/api/admin/slow-queries", headers=visitor)).status_code == 403
+    r = await client.get("/api/admin/slow-queries", headers=admin)
+    assert r.status_code == 200
+    assert set(r.json()) == {"enabled", "threshold_ms", "entries"}
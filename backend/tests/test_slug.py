@@ -0,0 +1,33 @@
+"""Slug generation and allocation tests."""
+
+from app.core.metrics import slug_collisions
+from app.services import slug as slug_service
+
+
+def test_generate_slug_format():
+    slugs = {slug_service.generate_slug() for _ in range(200)}
+    assert len(slugs) == 200
+    for s in slugs:
+        assert len(s) == slug_service.SLUG_LENGTH
+        assert set(s) <= set(slug_service.SLUG_ALPHABET)
+
+
+async def test_slug_collision_retries_and_is_counted(client, monkeypatch):
+    r_reg = await client.post(
+        "/api/auth/register",
+        json={"email": "slugs@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {r_reg.json()['access_token']}"}
+
+    r1 = await client.post("/api/wishlists", json={"name": "First", "occasion": "Test"}, headers=headers)
+    assert r1.status_code == 200
+    taken = r1.json()["slug"]
+
+    candidates = iter([taken, taken, "freshslug001"])
+    monkeypatch.setattr(slug_service, "generate_slug", lambda: next(candidates))
+    before = slug_collisions.value()
+
+    r2 = await client.post("/api/wishlists", json={"name": "Second", "occasion": "Test"}, headers=headers)
+    assert r2.status_code == 200
+    assert r2.json()["slug"] == "freshslug001"
+    assert slug_collisions.value() - before == 2
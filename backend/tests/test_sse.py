@@ -0,0 +1,67 @@
+"""Server-Sent Events endpoint tests."""
+
+import asyncio
+import json
+
+from app.core.config import settings
+from app.websocket import sse
+from app.websocket.manager import manager
+
+
+async def _next(gen, skip_heartbeats: bool = True) -> str:
+    while True:
+        chunk = await gen.__anext__()
+        if not (skip_heartbeats and chunk.startswith(":")):
+            return chunk
+
+
+async def test_stream_delivers_events_and_heartbeats():
+    gen = sse.stream("wishlist:sse-live", None, heartbeat=0.01)
+    assert (await gen.__anext__()).startswith("retry:")
+    assert await _next(gen, skip_heartbeats=False) == ": heartbeat\n\n"
+    await manager.broadcast("wishlist:sse-live", {"type": "reservation", "itemId": "1"})
+    chunk = await _next(gen)
+    assert chunk.startswith("id: 1\nevent: reservation\ndata: ")
+    assert json.loads(chunk.split("data: ", 1)[1])["itemId"] == "1"
+    await gen.aclose()
+    assert "wishlist:sse-live" not in manager._channels
+
+
+async def test_stream_resumes_from_last_event_id():
+    for n in range(3):
+        await manager.broadcast("wishlist:sse-resume", {"type": "reservation", "itemId": str(n)})
+    gen = sse.stream("wishlist:sse-resume", 1, heartbeat=0.01)
+    await gen.__anext__()
+    assert [(await _next(gen)).split("\n")[0] for _ in range(2)] == ["id: 2", "id: 3"]
+    await gen.aclose()
+
+    gen = sse.stream("wishlist:sse-resume", 99, heartbeat=0.01)
+    await gen.__anext__()
+    assert (await _next(gen)).startswith("id: 3\nevent: resync\n")
+    await gen.aclose()
+
+
+async def test_events_endpoint(client, db_session, monkeypatch):
+    r = await client.get("/api/wishlists/public/no-such-slug/events")
+    assert r.status_code == 404
+
+    r = await client.post("/api/auth/register", json={"email": "sse@example.com", "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    slug = (await client.post("/api/wishlists", json={"name": "SSE", "occasion": "Test"}, headers=headers)).json()["slug"]
+
+    monkeypatch.setattr(settings, "sse_heartbeat_interval", 0.01)
+    held = []
+
+    async def end_stream():
+        while f"wishlist:{slug}" not in manager._channels:
+            await asyncio.sleep(0.01)
+        held.append(db_session.in_transaction())
+        await manager.reap(timeout=-1)
+
+    ender = asyncio.create_task(end_stream())
+    r = await client.get(f"/api/wishlists/public/{slug}/events", headers={"Last-Event-ID": "0"})
+    await ender
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert r.text.startswith("retry:")
+    assert held == [False]
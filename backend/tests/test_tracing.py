@@ -0,0 +1,88 @@
+"""Request, DB and broadcast spans land in the JSON-lines trace file."""
+
+import json
+
+import pytest
+
+from app.core import tracing
+from app.websocket import outbox
+
+REMOTE_TRACE = "4bf92f3577b34da6a3ce929d0e0e4736"
+REMOTE_SPAN = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def traces(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr("app.core.tracing.settings.tracing_enabled", True)
+    monkeypatch.setattr("app.core.tracing.settings.tracing_sample_rate", 1.0)
+    monkeypatch.setattr("app.core.tracing.settings.tracing_file", str(path))
+
+    def read() -> list[dict]:
+        tracing.exporter.flush()
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    return read
+
+
+async def _wishlist(client, email: str) -> dict:
+    r = await client.post("/api/auth/register", json={"email": email, "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    wishlist = (await client.post("/api/wishlists", json={"name": "Traced", "occasion": "Test"}, headers=headers)).json()
+    item = (await client.post(
+        f"/api/wishlists/{wishlist['id']}/items",
+        json={"name": "Gift", "url": "https://example.com", "price": 10},
+        headers=headers,
+    )).json()
+    return {"slug": wishlist["slug"], "item_id": item["id"]}
+
+
+async def test_route_span_continues_remote_trace_with_db_children(client, traces):
+    wishlist = await _wishlist(client, "trace-read@example.com")
+    r = await client.get(
+        f"/api/wishlists/public/{wishlist['slug']}",
+        headers={"traceparent": f"00-{REMOTE_TRACE}-{REMOTE_SPAN}-01"},
+    )
+    assert r.status_code == 200
+    assert r.headers["traceparent"].startswith(f"00-{REMOTE_TRACE}-")
+
+    spans = [s for s in traces() if s["traceId"] == REMOTE_TRACE]
+    (root,) = [s for s in spans if s["parentSpanId"] == REMOTE_SPAN]
+    assert root["name"] == "GET /api/wishlists/public/{slug}"
+    assert root["attributes"]["http.status_code"] == 200
+    db = [s for s in spans if s["name"].startswith("db ")]
+    assert db and all(s["parentSpanId"] == root["spanId"] for s in db)
+    assert all(s["attributes"]["db.operation"] == "SELECT" for s in db)
+    assert any(s["name"] == "serialize" for s in spans)
+
+
+async def test_broadcast_carries_the_request_trace_id(client, traces, listen):
+    wishlist = await _wishlist(client, "trace-ws@example.com")
+    socket = listen(wishlist["slug"])
+    r = await client.post(
+        f"/api/wishlists/public/{wishlist['slug']}/items/{wishlist['item_id']}/reserve",
+        json={"anonymous_token": "traced-guest"},
+    )
+    assert r.status_code == 200
+    await outbox.flush()
+
+    trace_id = r.headers["traceparent"].split("-")[1]
+    assert [e["traceId"] for e in socket.events if e["type"] == "reservation"] == [trace_id]
+    (broadcast,) = [s for s in traces() if s["name"] == "ws.broadcast" and s["traceId"] == trace_id]
+    assert broadcast["attributes"]["ws.recipients"] == 1
+
+
+async def test_unsampled_traces_propagate_but_are_not_written(client, traces, monkeypatch):
+    monkeypatch.setattr("app.core.tracing.settings.tracing_sample_rate", 0.0)
+    r = await client.get("/api/wishlists/public/no-such-list")
+    assert r.status_code == 404
+    assert r.headers["traceparent"].endswith("-00")
+    assert traces() == []
+
+
+def test_malformed_traceparent_starts_a_new_trace():
+    assert tracing._parse_traceparent("00-xyz-abc-01") is None
+    assert tracing._parse_traceparent(f"00-{'0' * 32}-{REMOTE_SPAN}-01") is None
+    assert tracing._parse_traceparent(f"00-{REMOTE_TRACE}-{REMOTE_SPAN}-00") == (REMOTE_TRACE, REMOTE_SPAN, False)
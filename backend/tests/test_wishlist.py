@@ -1,11 +1,16 @@
 import asyncio
+from uuid import UUID as _UUID
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.models.wishlist import Reservation
+from app.services import wishlist as wishlist_service
+from tests.conftest import TEST_DATABASE_URL
 
 
 async def register_and_get_headers(client: AsyncClient, email: str, password: str) -> dict:
@@ -59,12 +64,52 @@ async def test_reservation_unique_constraint(client: AsyncClient, db_session: As
     )
     assert r2.status_code == 404, f"Second reservation must fail, got {r2.status_code}: {r2.text}"
 
-    from uuid import UUID as _UUID
     result = await db_session.execute(select(Reservation).where(Reservation.item_id == _UUID(item_id)))
     reservations = result.scalars().all()
     assert len(reservations) == 1
 
 
+@pytest.mark.asyncio
+async def test_concurrent_reservers_single_winner(client: AsyncClient, db_session: AsyncSession):
+    headers = await register_and_get_headers(client, "stampede@test.com", "strongpass123")
+    _, item_id, slug = await create_wishlist_with_item(client, headers)
+    item_uuid = _UUID(item_id)
+    await db_session.commit()
+
+    # A session per reserver, each on its own connection, all racing for one item.
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool, connect_args={"timeout": 30})
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def reserve(key: str, in_slug: str = slug) -> bool:
+        async with Session() as db:
+            won = await wishlist_service.reserve_item(db, in_slug, item_uuid, key, True)
+            await db.commit()
+            return won
+
+    async def unreserve(key: str) -> bool:
+        async with Session() as db:
+            done = await wishlist_service.unreserve_item(db, slug, item_uuid, key)
+            await db.commit()
+            return done
+
+    try:
+        keys = [f"guest_{i}" for i in range(12)]
+        results = await asyncio.gather(*(reserve(k) for k in keys))
+        assert sum(results) == 1
+        winner = keys[results.index(True)]
+        async with Session() as db:
+            rows = (await db.execute(select(Reservation.reserver_key).where(Reservation.item_id == item_uuid))).scalars().all()
+        assert rows == [winner]
+
+        loser = next(k for k in keys if k != winner)
+        assert await unreserve(loser) is False
+        assert await unreserve(winner) is True
+        assert await unreserve(winner) is False
+        assert await reserve(winner, in_slug="not-this-list") is False
+    finally:
+        await engine.dispose()
+
+
 @pytest.mark.asyncio
 async def test_delete_item_with_contributions_blocked(client: AsyncClient):
     headers = await register_and_get_headers(client, "deleter@test.com", "strongpass123")
@@ -1,5 +1,11 @@
 """Wishlists API tests."""
 
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from app.models.wishlist import Contribution, PriceObservation, Reservation, WishlistItem
+
 
 async def test_delete_wishlist(client):
     """DELETE /api/wishlists/{id} removes wishlist and returns 200."""
@@ -31,3 +37,41 @@ async def test_delete_wishlist(client):
     assert r_list.status_code == 200
     ids = [w["id"] for w in r_list.json()]
     assert wishlist_id not in ids
+
+
+async def test_bulk_delete_wishlists_cascades_in_database(client, db_session, owner_headers, wishlist_with_item):
+    """DELETE /api/wishlists removes the caller's lists and, via ON DELETE CASCADE, their items and rows."""
+    headers = owner_headers
+    ids, item_ids = [], []
+    for _ in range(3):
+        wishlist, gift_ids = await wishlist_with_item({"name": "Gift 0"}, {"name": "Gift 1"})
+        ids.append(wishlist["id"])
+        item_ids += gift_ids
+        for i, item_id in enumerate(gift_ids):
+            await client.post(f"/api/wishlists/public/{wishlist['slug']}/items/{item_id}/{'reserve' if i else 'contribute'}",
+                              json={"amount": 5, "anonymous_token": "guest"})
+    r = await client.post("/api/auth/register", json={"email": "bulk-other@example.com", "password": "secret123"})
+    other = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    foreign = (await client.post("/api/wishlists", json={"name": "Not mine", "occasion": "Test"}, headers=other)).json()["id"]
+
+    async def count(model) -> int:
+        return await db_session.scalar(select(func.count()).select_from(model))
+
+    db_session.add(PriceObservation(item_id=UUID(item_ids[0]), price=1))
+    await db_session.commit()
+    before = {model: await count(model) for model in (WishlistItem, Reservation, Contribution, PriceObservation)}
+
+    r = await client.request("DELETE", "/api/wishlists", json={"ids": ids[:2] + [foreign]}, headers=headers)
+    assert r.status_code == 200
+    assert r.json() == {"deleted": 2}
+
+    r_list = await client.get("/api/wishlists/my", headers=headers)
+    assert [w["id"] for w in r_list.json()] == [ids[2]]
+    assert (await client.get(f"/api/wishlists/{foreign}", headers=other)).status_code == 200
+    assert await count(WishlistItem) == before[WishlistItem] - 4
+    assert await count(Reservation) == before[Reservation] - 2
+    assert await count(Contribution) == before[Contribution] - 2
+    assert await count(PriceObservation) == before[PriceObservation] - 1
+
+    r = await client.request("DELETE", "/api/wishlists", json={"ids": []}, headers=headers)
+    assert r.status_code == 422
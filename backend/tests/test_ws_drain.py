@@ -0,0 +1,103 @@
+"""Shutdown drains live sockets in staggered batches with a reconnect hint."""
+
+import asyncio
+import time
+
+import pytest
+import uvicorn
+
+from app.core import lifecycle
+from app.server import Server
+from app.websocket import sse
+from app.websocket.manager import CLOSE_RESTARTING, ConnectionManager, manager
+from tests.conftest import FakeSocket
+
+
+@pytest.fixture
+def hints(monkeypatch):
+    monkeypatch.setattr("app.websocket.manager.settings.ws_reconnect_min_ms", 2000)
+    monkeypatch.setattr("app.websocket.manager.settings.ws_reconnect_max_ms", 9000)
+
+
+@pytest.fixture
+def global_manager_draining():
+    yield manager
+    manager.draining = False
+
+
+async def test_drain_closes_in_staggered_batches_before_the_deadline(hints):
+    pool = ConnectionManager(max_connections=100, max_per_channel=100)
+    sockets = [FakeSocket() for _ in range(5)]
+    for ws in sockets:
+        assert await pool.accept(ws)
+        pool.subscribe(ws, "wishlist:drain")
+
+    started = time.monotonic()
+    assert await pool.drain(timeout=0.3, batch_size=2) == 5
+    assert time.monotonic() - started < 0.4
+
+    assert pool.connection_count == 0
+    assert all(ws.close_code == CLOSE_RESTARTING for ws in sockets)
+    assert all(2000 <= int(ws.close_reason) <= 9000 for ws in sockets)
+    assert len({ws.close_reason for ws in sockets}) > 1
+    times = [ws.closed_at - started for ws in sockets]
+    # Three batches, 0.1 s apart: [0, 0], [0.1, 0.1], [0.2].
+    assert times[1] < 0.05 and 0.08 < times[2] < 0.18 and times[4] > 0.18
+
+    late = FakeSocket()
+    assert not await pool.accept(late)
+    assert late.accepted and late.close_code == CLOSE_RESTARTING
+    assert pool.connection_count == 0
+
+
+async def test_drain_gives_up_on_a_socket_that_will_not_close():
+    pool = ConnectionManager(max_connections=10, max_per_channel=10)
+    stuck, fine = FakeSocket(), FakeSocket()
+
+    async def never_closes(code: int = 1000, reason: str | None = None):
+        await asyncio.sleep(10)
+
+    stuck.close = never_closes
+    for ws in (stuck, fine):
+        await pool.accept(ws)
+    started = time.monotonic()
+    assert await pool.drain(timeout=0.1, batch_size=10) == 2
+    assert time.monotonic() - started < 0.5
+    assert fine.close_code == CLOSE_RESTARTING
+
+
+async def test_sse_stream_ends_with_the_retry_hint(hints, global_manager_draining):
+    events = sse.stream("wishlist:sse-drain", None, heartbeat=30)
+    assert (await anext(events)).startswith("retry: ")
+    pending = asyncio.ensure_future(anext(events))
+    await asyncio.sleep(0)
+    await manager.drain(timeout=0)
+    hint = await asyncio.wait_for(pending, 1)
+    assert 2000 <= int(hint.removeprefix("retry: ").strip()) <= 9000
+    with pytest.raises(StopAsyncIteration):
+        await anext(events)
+
+    # While draining, new streams only get a hint.
+    late = [chunk async for chunk in sse.stream("wishlist:sse-drain", None)]
+    assert len(late) == 1 and late[0].startswith("retry: ")
+
+
+async def test_server_drains_before_uvicorn_closes_connections(monkeypatch):
+    order = []
+
+    async def drain():
+        order.append(("drain", lifecycle.state.ready))
+
+    async def uvicorn_shutdown(self, sockets=None):
+        order.append(("uvicorn", None))
+
+    monkeypatch.setattr(manager, "drain", drain)
+    monkeypatch.setattr(uvicorn.Server, "shutdown", uvicorn_shutdown)
+    monkeypatch.setattr(lifecycle.state, "ready", True)
+    monkeypatch.setattr(lifecycle.state, "draining", False)
+
+    server = Server(uvicorn.Config("app.main:app"))
+    server.servers = []
+    await server.shutdown()
+    assert order == [("drain", False), ("uvicorn", None)]
+    assert lifecycle.state.draining
@@ -0,0 +1,55 @@
+"""WebSocket ping/pong, reaping and connection cap tests."""
+
+import json
+
+from app.websocket.manager import CLOSE_OVERLOADED, CLOSE_UNRESPONSIVE, ConnectionManager
+from tests.conftest import FakeSocket
+
+
+async def test_reap_pings_live_sockets_and_evicts_silent_ones():
+    manager = ConnectionManager()
+    live, silent = FakeSocket(), FakeSocket()
+    await manager.connect(live, "wishlist:a")
+    await manager.connect(silent, "wishlist:b")
+    now = manager._last_seen[silent] + 100
+    manager._last_seen[live] = now - 1
+    before, after = await manager.reap(timeout=60, now=now)
+    assert (before, after) == (2, 1)
+    assert silent.close_code == CLOSE_UNRESPONSIVE
+    assert json.loads(live.sent[-1]) == {"type": "ping"}
+    assert "wishlist:b" not in manager._channels
+
+
+async def test_touch_keeps_socket_alive():
+    manager = ConnectionManager()
+    ws = FakeSocket()
+    await manager.connect(ws, "wishlist:a")
+    manager.touch(ws)
+    assert await manager.reap(timeout=60) == (1, 1)
+    assert ws.close_code is None
+
+
+async def test_connection_caps():
+    manager = ConnectionManager(max_connections=3, max_per_channel=2)
+    sockets = [FakeSocket() for _ in range(4)]
+    assert await manager.connect(sockets[0], "wishlist:a")
+    assert await manager.connect(sockets[1], "wishlist:a")
+    assert not await manager.connect(sockets[2], "wishlist:a")
+    assert sockets[2].close_code == CLOSE_OVERLOADED
+    assert await manager.connect(sockets[2], "wishlist:b")
+    assert not await manager.connect(sockets[3], "wishlist:c")
+    assert manager.connection_count == 3
+
+
+async def test_replay_buffer_is_bounded(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "ws_replay_buffer", 3)
+    manager = ConnectionManager()
+    for n in range(5):
+        await manager.broadcast("wishlist:a", {"type": "reservation", "itemId": str(n)})
+    assert manager.last_seq("wishlist:a") == 5
+    assert [json.loads(p)["seq"] for p in manager.replay("wishlist:a", 2)] == [3, 4, 5]
+    assert manager.replay("wishlist:a", 5) == []
+    assert manager.replay("wishlist:a", 1) is None
+    assert manager.replay("wishlist:unknown", 4) is None
@@ -0,0 +1,84 @@
+"""Multiplexed /ws endpoint tests."""
+
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import get_read_db
+from app.main import app
+from app.websocket.manager import manager
+from tests.conftest import TEST_DATABASE_URL, FakeSocket
+
+
+async def _slugs(client, count: int, email: str = "mux@example.com") -> list[str]:
+    r = await client.post("/api/auth/register", json={"email": email, "password": "secret123"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    slugs = []
+    for n in range(count):
+        r = await client.post("/api/wishlists", json={"name": f"Mux {n}", "occasion": "Test"}, headers=headers)
+        slugs.append(r.json()["slug"])
+    return slugs
+
+
+def _ws_client() -> TestClient:
+    # The TestClient runs the app on its own event loop, so give it its own engine.
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override
+    return TestClient(app)
+
+
+async def test_one_socket_carries_many_channels(client):
+    a, b = await _slugs(client, 2)
+    with _ws_client().websocket_connect("/ws") as ws:
+        ws.send_text(json.dumps({"type": "subscribe", "slug": a}))
+        assert ws.receive_json() == {"type": "subscribed", "channel": f"wishlist:{a}", "seq": 0}
+        ws.send_text(json.dumps({"type": "subscribe", "slug": b}))
+        assert ws.receive_json() == {"type": "subscribed", "channel": f"wishlist:{b}", "seq": 0}
+        ws.send_text(json.dumps({"type": "subscribe", "slug": "no-such-slug"}))
+        assert ws.receive_json()["detail"] == "not_found"
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "bad_request"}
+
+        (socket,) = [s for s in manager._subscriptions if manager.subscriptions(s)]
+        assert manager.subscriptions(socket) == {f"wishlist:{a}", f"wishlist:{b}"}
+
+        ws.send_text(json.dumps({"type": "unsubscribe", "slug": a}))
+        assert ws.receive_json() == {"type": "unsubscribed", "channel": f"wishlist:{a}"}
+        assert manager.subscriptions(socket) == {f"wishlist:{b}"}
+    assert manager.connection_count == 0
+
+
+async def test_broadcast_tags_channel():
+    socket = FakeSocket()
+    await manager.accept(socket)
+    manager.subscribe(socket, "wishlist:tagged")
+    try:
+        await manager.broadcast("wishlist:tagged", {"type": "reservation", "itemId": "1"})
+    finally:
+        manager.disconnect(socket)
+    assert socket.events[0] == {"type": "reservation", "itemId": "1", "channel": "wishlist:tagged", "seq": 1}
+
+
+async def test_resubscribe_replays_missed_events(client):
+    (slug,) = await _slugs(client, 1, "replay@example.com")
+    channel = f"wishlist:{slug}"
+    for n in range(3):
+        await manager.broadcast(channel, {"type": "reservation", "itemId": str(n)})
+    with _ws_client().websocket_connect("/ws") as ws:
+        ws.send_text(json.dumps({"type": "subscribe", "slug": slug, "since": 1}))
+        assert ws.receive_json()["seq"] == 3
+        assert [ws.receive_json()["seq"] for _ in range(2)] == [2, 3]
+        ws.send_text(json.dumps({"type": "subscribe", "slug": slug, "since": 3}))
+        assert ws.receive_json()["type"] == "subscribed"
+        ws.send_text(json.dumps({"type": "subscribe", "slug": slug, "since": 99}))
+        ws.receive_json()
+        assert ws.receive_json() == {"type": "resync", "channel": channel, "seq": 3}
@@ -5,7 +5,8 @@ import Link from "next/link";
 import { GoogleAuthButton } from "@/components/GoogleAuthButton";
 import { useParams } from "next/navigation";
 import useSWR from "swr";
-import { api, getApiUrl, getWsUrl, getAnonymousToken } from "@/lib/api";
+import { api, getApiUrl, getAnonymousToken, getImageUrl, idempotentFetch, imageFallback } from "@/lib/api";
+import { subscribeWishlist } from "@/lib/ws";
 
 interface WishlistItemPublic {
   id: string;
@@ -13,6 +14,7 @@ interface WishlistItemPublic {
   url: string;
   price: number;
   image_url: string | null;
+  image_hash: string | null;
   target_amount: number | null;
   reserved: boolean;
   reserved_by_me: boolean;
@@ -54,12 +56,7 @@ export default function PublicWishlistPage() {
 
   useEffect(() => {
     if (!slug) return;
-    const wsUrl = getWsUrl(`/ws/wishlist/${slug}`);
-    const url = wsUrl.startsWith("http") ? wsUrl.replace(/^http/, "ws") : wsUrl;
-    const ws = new WebSocket(url);
-    ws.onmessage = () => mutate();
-    ws.onerror = () => ws.close();
-    return () => ws.close();
+    return subscribeWishlist(slug, () => mutate());
   }, [slug, mutate]);
 
   return (
@@ -150,7 +147,7 @@ function PublicItemCard({
       const headers: Record<string, string> = { "Content-Type": "application/json" };
       if (token) headers["Authorization"] = `Bearer ${token}`;
       const body = token ? {} : { anonymous_token: anonToken };
-      const res = await fetch(getApiUrl(`/wishlists/public/${slug}/items/${item.id}/reserve`), {
+      const res = await idempotentFetch(getApiUrl(`/wishlists/public/${slug}/items/${item.id}/reserve`), {
         method: "POST",
         headers,
         body: JSON.stringify(body),
@@ -210,7 +207,7 @@ function PublicItemCard({
       const headers: Record<string, string> = { "Content-Type": "application/json" };
       if (token) headers["Authorization"] = `Bearer ${token}`;
       const body = token ? { amount } : { amount, anonymous_token: anonToken };
-      const res = await fetch(getApiUrl(`/wishlists/public/${slug}/items/${item.id}/contribute`), {
+      const res = await idempotentFetch(getApiUrl(`/wishlists/public/${slug}/items/${item.id}/contribute`), {
         method: "POST",
         headers,
         body: JSON.stringify(body),
@@ -242,10 +239,12 @@ function PublicItemCard({
         <div className="w-24 h-24 flex-shrink-0 rounded-xl bg-gradient-to-br from-slate-100 to-slate-50 dark:from-slate-800 dark:to-slate-700 overflow-hidden relative">
           {item.image_url && (
             <img
-              src={item.image_url}
+              src={item.image_hash ? getImageUrl(item.image_hash, 160) : item.image_url}
+              srcSet={item.image_hash ? `${getImageUrl(item.image_hash, 160)} 1x, ${getImageUrl(item.image_hash, 320)} 2x` : undefined}
+              loading="lazy"
               alt=""
               className="w-full h-full object-cover absolute inset-0 z-10"
-              onError={(e) => e.currentTarget.style.display = "none"}
+              onError={imageFallback(item.image_url)}
             />
           )}
           <div className="w-full h-full flex items-center justify-center text-slate-300 dark:text-slate-600 text-3xl">
@@ -7,7 +7,8 @@ import useSWR from "swr";
 import { useAuth } from "@/lib/auth";
 import { Header } from "@/components/Header";
 import { ConfirmModal } from "@/components/ConfirmModal";
-import { api, getWsUrl } from "@/lib/api";
+import { api, getImageUrl, imageFallback } from "@/lib/api";
+import { subscribeWishlist } from "@/lib/ws";
 
 interface WishlistItemOwner {
   id: string;
@@ -15,6 +16,7 @@ interface WishlistItemOwner {
   url: string;
   price: number;
   image_url: string | null;
+  image_hash: string | null;
   target_amount: number | null;
   reserved: boolean;
   total_contributed: number;
@@ -50,12 +52,7 @@ export default function WishlistPage() {
 
   useEffect(() => {
     if (!wishlist?.slug) return;
-    const wsUrl = getWsUrl(`/ws/wishlist/${wishlist.slug}`);
-    const url = wsUrl.startsWith("http") ? wsUrl.replace(/^http/, "ws") : wsUrl;
-    const ws = new WebSocket(url);
-    ws.onmessage = () => mutate();
-    ws.onerror = () => ws.close();
-    return () => ws.close();
+    return subscribeWishlist(wishlist.slug, () => mutate());
   }, [wishlist?.slug, mutate]);
 
   if (authLoading) return null;
@@ -151,7 +148,7 @@ export default function WishlistPage() {
                   >
                     <div className="w-24 h-24 flex-shrink-0 rounded-xl bg-gradient-to-br from-slate-100 to-slate-50 dark:from-slate-800 dark:to-slate-700 overflow-hidden relative">
                       {item.image_url && (
-                        <img src={item.image_url} alt="" className="w-full h-full object-cover absolute inset-0 z-10" onError={(e) => e.currentTarget.style.display = "none"} />
+                        <img src={item.image_hash ? getImageUrl(item.image_hash, 320) : item.image_url} loading="lazy" alt="" className="w-full h-full object-cover absolute inset-0 z-10" onError={imageFallback(item.image_url)} />
                       )}
                       <div className="w-full h-full flex items-center justify-center text-slate-300 dark:text-slate-600 text-3xl">🎁</div>
                     </div>
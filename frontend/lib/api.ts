@@ -5,6 +5,24 @@ export function getApiUrl(path: string): string {
   return `${API_URL}${path}`;
 }
 
+export function getImageUrl(hash: string, width: number): string {
+  return getApiUrl(`/img/${hash}?w=${width}`);
+}
+
+// If the cached thumbnail fails to load, try the original image once before hiding it.
+export function imageFallback(original: string | null) {
+  return (e: { currentTarget: HTMLImageElement }) => {
+    const img = e.currentTarget;
+    if (original && img.dataset.fallback !== "1") {
+      img.dataset.fallback = "1";
+      img.removeAttribute("srcset");
+      img.src = original;
+    } else {
+      img.style.display = "none";
+    }
+  };
+}
+
 export function getWsUrl(path: string): string {
   const base = WS_URL.replace(/^http/, "ws");
   return `${base}${path}`;
@@ -75,6 +93,24 @@ export async function api<T>(
   throw lastErr;
 }
 
+/**
+ * POST/DELETE that is safe to retry: one Idempotency-Key per call, reused on
+ * network-level retries so the server replays instead of re-applying.
+ */
+export async function idempotentFetch(url: string, init: RequestInit, attempts = 3): Promise<Response> {
+  const headers = { ...(init.headers as Record<string, string>), "Idempotency-Key": crypto.randomUUID() };
+  let lastErr: unknown;
+  for (let attempt = 0; attempt < attempts; attempt++) {
+    try {
+      return await fetch(url, { ...init, headers });
+    } catch (e) {
+      lastErr = e;
+      await new Promise((r) => setTimeout(r, 500 * 2 ** attempt));
+    }
+  }
+  throw lastErr;
+}
+
 export function getAnonymousToken(): string {
   if (typeof window === "undefined") return "";
   let t = localStorage.getItem("anonymous_token");
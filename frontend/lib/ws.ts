@@ -0,0 +1,87 @@
+import { getWsUrl } from "@/lib/api";
+
+type Listener = (event: { type: string; channel: string; [key: string]: unknown }) => void;
+
+const listeners = new Map<string, Set<Listener>>();
+// Last sequence number seen per channel, sent back as `since` so a reconnect only replays what was missed.
+const lastSeq = new Map<string, number>();
+let socket: WebSocket | null = null;
+let retry = 0;
+let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+// Close code sent by a server that is restarting; the reason is how long to wait, in ms.
+const CLOSE_RESTARTING = 4012;
+
+function send(message: object) {
+  if (socket?.readyState === WebSocket.OPEN) socket.send(JSON.stringify(message));
+}
+
+function slugOf(channel: string) {
+  return channel.replace(/^wishlist:/, "");
+}
+
+function connect() {
+  if (socket || typeof window === "undefined") return;
+  const ws = new WebSocket(getWsUrl("/ws"));
+  socket = ws;
+  ws.onopen = () => {
+    retry = 0;
+    listeners.forEach((_, channel) => send({ type: "subscribe", slug: slugOf(channel), since: lastSeq.get(channel) }));
+  };
+  ws.onmessage = (msg) => {
+    const event = JSON.parse(msg.data);
+    if (event.type === "ping") {
+      send({ type: "pong" });
+      return;
+    }
+    if (!event.channel) return;
+    if (event.type === "unsubscribed" || event.type === "error") return;
+    if (event.type === "subscribed") {
+      if (!lastSeq.has(event.channel)) lastSeq.set(event.channel, event.seq);
+      return;
+    }
+    if (typeof event.seq === "number") {
+      const seen = lastSeq.get(event.channel);
+      if (event.type !== "resync" && seen !== undefined && event.seq <= seen) return;
+      lastSeq.set(event.channel, event.seq);
+    }
+    listeners.get(event.channel)?.forEach((listener) => listener(event));
+  };
+  ws.onerror = () => ws.close();
+  ws.onclose = (event) => {
+    socket = null;
+    if (listeners.size === 0) return;
+    const hint = event.code === CLOSE_RESTARTING ? Number.parseInt(event.reason, 10) : NaN;
+    const delay = Number.isFinite(hint) ? hint : Math.min(30000, 1000 * 2 ** retry++);
+    reconnectTimer = setTimeout(() => {
+      reconnectTimer = null;
+      connect();
+    }, delay);
+  };
+}
+
+/** Subscribe to a wishlist's events over the single shared socket. Returns the unsubscribe function. */
+export function subscribeWishlist(slug: string, listener: Listener): () => void {
+  const channel = `wishlist:${slug}`;
+  let set = listeners.get(channel);
+  if (!set) {
+    set = new Set();
+    listeners.set(channel, set);
+    send({ type: "subscribe", slug });
+  }
+  set.add(listener);
+  connect();
+  return () => {
+    const current = listeners.get(channel);
+    if (!current) return;
+    current.delete(listener);
+    if (current.size > 0) return;
+    listeners.delete(channel);
+    lastSeq.delete(channel);
+    send({ type: "unsubscribe", slug });
+    if (listeners.size === 0) {
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      reconnectTimer = null;
+      socket?.close();
+    }
+  };
+}